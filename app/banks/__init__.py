@@ -4,6 +4,17 @@ from .myb import MYB
 from .rhb import RHB
 from .pbb import PBB
 from .cimb import CIMB
+from .statement_record import StatementRecord
+from .transactions import TransactionTable
 
+BANK_CLASSES = {
+    "UOB": UOB,
+    "HLB": HLB,
+    "MYB": MYB,
+    "RHB": RHB,
+    "PBB": PBB,
+    "CIMB": CIMB,
+}
 
-__all__ = ['UOB', 'HLB', 'MYB', 'RHB', 'PBB', 'CIMB']
\ No newline at end of file
+
+__all__ = ['UOB', 'HLB', 'MYB', 'RHB', 'PBB', 'CIMB', 'BANK_CLASSES', 'StatementRecord', 'TransactionTable']
\ No newline at end of file
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Optional, Pattern, Tuple
+import logging
 import re
+from credit_card_tracker.app.banks.statement_record import StatementRecord, to_cents
+from credit_card_tracker.app.banks.transactions import LOCAL_CURRENCY, TransactionTable
 from credit_card_tracker.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,18 +26,170 @@ class BankConfig:
     payment_date_keyword : List[str]
     date_pattern: str = r"((?:\d{2} \w{3} \d{4})|(?:\d{2} \w{3} \d{2})|(?:\d{2}/\d{2}/\d{4})|(?:\d{2}/\d{2}/\d{2})|(?:\d{4}-\d{2}-\d{2})|(?:\d{2}-\d{2}-\d{4})|(?:\d{2}-\d{2}-\d{2}))"
     amount_pattern: str = r"(\d{1,3}(?:,\d{3})*\.\d{2})"
-    
-   
-    
+
+    def compile(self) -> "CompiledBankConfig":
+        """Compile the regex patterns, and each keyword list into one alternation"""
+        compiled = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if field.name.endswith("_pattern"):
+                compiled[field.name] = re.compile(value)
+            elif isinstance(value, list):
+                compiled[field.name] = compile_keywords(value)
+            else:
+                compiled[field.name] = value
+        return CompiledBankConfig(**compiled)
+
+
+# Never matches, stands in for an empty keyword list
+NO_KEYWORDS = re.compile(r"(?!)")
+
+CARD_NAME_PATTERN = re.compile(r"[A-Za-z]+")
+
+# Date column of a transaction row: "05 FEB", "05/02", optionally with the year
+POSTING_DATE_PATTERN = re.compile(r"\d{1,2}[ /-](?:[A-Za-z]{3}|\d{1,2})(?:[ /-]\d{2,4})?")
+
+
+def compile_keywords(keywords: List[str]) -> Pattern:
+    """One regex whose .search() is true exactly when any(kw in line for kw in keywords)"""
+    if not keywords:
+        return NO_KEYWORDS
+    return re.compile("|".join(re.escape(kw) for kw in sorted(keywords, key = len, reverse = True)))
+
+
+@dataclass(frozen=True)
+class CompiledBankConfig:
+    """Compiled form of a BankConfig, built once per bank class by BaseBank.get_compiled_config"""
+    name: str
+    card_pattern: Pattern
+    start_keywords: Pattern
+    end_keywords: Pattern
+    previous_balance_keywords: Pattern
+    credit_payment_keywords: Pattern
+    debit_fees_keywords: Pattern
+    balance_due_keywords: Pattern
+    retail_purchase_keywords: Pattern
+    minimum_payment_keywords : Pattern
+    foreign_currencies: Pattern
+    statement_date_keyword : Pattern
+    payment_date_keyword : Pattern
+    date_pattern: Pattern
+    amount_pattern: Pattern
+
+
+class LineCategory:
+    """Tags assigned to statement lines by LineClassifier"""
+    PREVIOUS_BALANCE = "previous_balance"
+    CREDIT_PAYMENT = "credit_payment"
+    DEBIT_FEES = "debit_fees"
+    BALANCE_DUE = "balance_due"
+    MINIMUM_PAYMENT = "minimum_payment"
+    RETAIL_PURCHASE = "retail_purchase"  # labelled retail total, e.g. MYB "(JUMLAH DEBIT)"
+    RETAIL_AMOUNT = "retail_amount"  # bare amount line of a local transaction
+    FOREIGN_AMOUNT = "foreign_amount"  # bare amount line right after a foreign currency line
+
+    KEYWORD_FIELDS = {
+        PREVIOUS_BALANCE: "previous_balance_keywords",
+        CREDIT_PAYMENT: "credit_payment_keywords",
+        DEBIT_FEES: "debit_fees_keywords",
+        BALANCE_DUE: "balance_due_keywords",
+        MINIMUM_PAYMENT: "minimum_payment_keywords",
+        RETAIL_PURCHASE: "retail_purchase_keywords",
+    }
+
+
+class LineClassifier:
+    """Tag a line with the first matching category, in the bank's priority order.
+
+    All keyword categories share one alternation with a named group per category, so a
+    line that matches nothing (the common case) costs a single regex search. On a hit,
+    only the categories ranked above the first hit are rechecked, which keeps the
+    result identical to walking the categories in order with any().
+    """
+
+    def __init__(self, config: BankConfig, categories: Tuple[str, ...]):
+        self.categories = categories
+        self.keyword_patterns = []
+        groups = []
+        for category in categories:
+            keywords = getattr(config, LineCategory.KEYWORD_FIELDS.get(category, ""), None)
+            if keywords:
+                alternation = "|".join(re.escape(kw) for kw in sorted(keywords, key = len, reverse = True))
+                groups.append(f"(?P<{category}>{alternation})")
+                self.keyword_patterns.append((category, re.compile(alternation)))
+        self.pattern = re.compile("|".join(groups)) if groups else NO_KEYWORDS
+        self.amount_pattern = re.compile(config.amount_pattern)
+        self.foreign_currencies = compile_keywords(config.foreign_currencies)
+        self.retail_amounts = LineCategory.RETAIL_AMOUNT in categories
+        self.foreign_amounts = LineCategory.FOREIGN_AMOUNT in categories
+
+    def classify(self, line: str, previous_line: str = "") -> Optional[str]:
+        match = self.pattern.search(line)
+        if match:
+            first_hit = match.lastgroup
+            for category, pattern in self.keyword_patterns:
+                if category == first_hit or pattern.search(line):
+                    return category
+
+        if (self.retail_amounts or self.foreign_amounts) and self.amount_pattern.fullmatch(line) and not any(c.isalpha() for c in line):
+            if self.foreign_amounts and self.foreign_currencies.search(previous_line):
+                return LineCategory.FOREIGN_AMOUNT
+            if self.retail_amounts:
+                return LineCategory.RETAIL_AMOUNT
+        return None
+
+
+@dataclass
+class StatementScan:
+    """Output of BaseBank.scan, shared by extract and process_date"""
+    blocks: Dict[str, List[str]] = field(default_factory=dict)
+    # (line index, last 4 digits) of every card number up to the first end keyword
+    card_anchors: List[Tuple[int, str]] = field(default_factory=list)
+    # Indexes of statement/payment date keyword lines near the top of the statement
+    date_anchors: List[int] = field(default_factory=list)
+
+    @property
+    def date_start(self) -> int:
+        """Line index process_date can start from, nothing before it holds a date keyword"""
+        return self.date_anchors[0] if self.date_anchors else 0
+
 
 class BaseBank(ABC):
+    _compiled_configs: Dict[type, CompiledBankConfig] = {}
+    _line_classifiers: Dict[type, LineClassifier] = {}
+    _summary_patterns: Dict[type, Pattern] = {}
+
+    # process_date only looks at the top of the statement
+    DATE_SCAN_LINES = 50
+
+    # Order in which process_block checks line categories, first match wins
+    LINE_CATEGORIES: Tuple[str, ...] = (
+        LineCategory.PREVIOUS_BALANCE,
+        LineCategory.CREDIT_PAYMENT,
+        LineCategory.DEBIT_FEES,
+        LineCategory.BALANCE_DUE,
+        LineCategory.RETAIL_AMOUNT,
+        LineCategory.FOREIGN_AMOUNT,
+    )
+
+    # Keyword fields whose amount on the next line is a statement summary, not a transaction
+    SUMMARY_KEYWORDS: Tuple[str, ...] = (
+        "previous_balance_keywords",
+        "debit_fees_keywords",
+        "balance_due_keywords",
+        "minimum_payment_keywords",
+        "retail_purchase_keywords",
+    )
+
     def __init__(self):
         try:
             logger.debug("Initializing BaseBank and fetching configuration.")
             self.config = self.get_config()
-            logger.debug(f"Configuration loaded: {self.config}")
+            self.patterns = self.get_compiled_config()
+            self.classifier = self.get_line_classifier()
+            logger.debug("Configuration loaded: %s", self.config)
         except Exception as e:
-            logger.error(f"Error initializing BaseBank: {e}")
+            logger.error("Error initializing BaseBank: %s", e)
             raise
 
     @classmethod
@@ -42,155 +197,268 @@ class BaseBank(ABC):
     def get_config(cls) -> BankConfig:
         """Return bank-specific configuration"""
         pass
+
+    @classmethod
+    def get_compiled_config(cls) -> CompiledBankConfig:
+        """Return the compiled configuration, compiling it on first use for this bank class"""
+        compiled = BaseBank._compiled_configs.get(cls)
+        if compiled is None:
+            compiled = cls.get_config().compile()
+            BaseBank._compiled_configs[cls] = compiled
+        return compiled
+
+    @classmethod
+    def get_line_classifier(cls) -> LineClassifier:
+        classifier = BaseBank._line_classifiers.get(cls)
+        if classifier is None:
+            classifier = LineClassifier(cls.get_config(), cls.LINE_CATEGORIES)
+            BaseBank._line_classifiers[cls] = classifier
+        return classifier
+
+    @classmethod
+    def get_summary_pattern(cls) -> Pattern:
+        pattern = BaseBank._summary_patterns.get(cls)
+        if pattern is None:
+            config = cls.get_config()
+            pattern = compile_keywords([kw for name in cls.SUMMARY_KEYWORDS for kw in getattr(config, name)])
+            BaseBank._summary_patterns[cls] = pattern
+        return pattern
+
+    def classify_line(self, line: str, previous_line: str = "") -> Optional[str]:
+        """Return the LineCategory of a stripped line, or None if it carries nothing to extract"""
+        return self.classifier.classify(line, previous_line)
+
+    @staticmethod
+    def extract_card_name(text: str) -> str:
+        return " ".join(CARD_NAME_PATTERN.findall(text)).strip()
     
-    def create_blocks(self, lines: List[str]) -> Dict[str, List[str]]:
+    def card_context(self, lines: List[str], index: int) -> str:
+        """Lines around a card number that carry its card name, joined into one line"""
+        return " ".join(lines[max(index - 2, 0): index + 2]).strip()
+
+    def scan(self, lines: List[str]) -> StatementScan:
+        """Build the card blocks and collect card and date anchors in one pass.
+
+        Stops once the blocks are closed, the end keyword has been seen and the
+        date window is passed, so a StreamedLines view is not decoded further.
+        """
         logger.debug("Starting to create blocks from statement lines.")
-        blocks = {}
+        scan = StatementScan()
         current_card = None
         current_block = []
         in_block = False
         found_start = False
+        blocks_done = False
+        anchors_done = False
+        trace = logger.isEnabledFor(logging.DEBUG)
 
-        for line in lines:
+        for index, line in enumerate(lines):
+            if blocks_done and anchors_done and index >= self.DATE_SCAN_LINES:
+                break
             clean_line = ' '.join(line.split())
-            logger.debug(f"Processing line: {clean_line}")
-            
+            if trace:
+                logger.debug("Processing line: %s", clean_line)
+
             try:
+                if index < self.DATE_SCAN_LINES:
+                    stripped = line.strip()
+                    if self.patterns.statement_date_keyword.search(stripped) or self.patterns.payment_date_keyword.search(stripped):
+                        scan.date_anchors.append(index)
+
+                # Card anchors run up to and including the first end keyword line
+                anchor_checked = not anchors_done
+                if anchor_checked:
+                    anchor_match = self.patterns.card_pattern.search(line)
+                    if anchor_match:
+                        scan.card_anchors.append((index, anchor_match.group(2)))
+                    if self.patterns.end_keywords.search(line):
+                        anchors_done = True
+
+                if blocks_done:
+                    continue
+
                 if not found_start:
-                    if any(start_kw in clean_line for start_kw in self.config.start_keywords):
+                    if self.patterns.start_keywords.search(clean_line):
                         found_start = True  # Now we can start parsing
                         logger.debug("Found start keyword. Beginning block parsing.")
                     continue  # Skip until start keyword is found
 
                 # Detect card number
-                card_match = re.search(self.config.card_pattern, clean_line)
+                if anchor_checked and clean_line == line:
+                    card_match = anchor_match
+                else:
+                    card_match = self.patterns.card_pattern.search(clean_line)
                 if card_match:
                     if current_card:
-                        logger.debug(f"Ending block for card: {current_card}")
-                        blocks[current_card] = current_block
+                        logger.debug("Ending block for card: %s", current_card)
+                        scan.blocks[current_card] = current_block
                     current_card = card_match.group(2)
-                    logger.debug(f"Detected card number: {current_card}")
+                    logger.debug("Detected card number: %s", current_card)
                     current_block = [line]
-                    
-                    two_lines_in_one =  " ".join(lines[lines.index(line)-2: lines.index(line)+2]).strip()
+
+                    two_lines_in_one = self.card_context(lines, index)
                     current_block.append(two_lines_in_one)
-                    logger.info(f"Appended {two_lines_in_one} to current block for card: {current_card}")
+                    logger.info("Appended %s to current block for card: %s", two_lines_in_one, current_card)
                     in_block = True
                     continue
-                
+
                 # Detect end of block
-                if in_block and any(end_kw in clean_line for end_kw in self.config.end_keywords):
-                    logger.debug(f"Detected end keyword. Ending block for card: {current_card}")
-                    blocks[current_card] = current_block + [line]
+                if in_block and self.patterns.end_keywords.search(clean_line):
+                    logger.debug("Detected end keyword. Ending block for card: %s", current_card)
+                    scan.blocks[current_card] = current_block + [line]
                     current_card = None
                     current_block = []
                     in_block = False
-                    break
-                
+                    blocks_done = True
+                    continue
+
                 if in_block:
                     current_block.append(line)
             except Exception as e:
-                logger.error(f"Error processing line: {clean_line}. Error: {e}")
+                logger.error("Error processing line: %s. Error: %s", clean_line, e)
 
-        if not blocks:
+        if not scan.blocks:
             logger.warning("No blocks were created. Check if the input lines contain valid data.")
         logger.info("Finished creating blocks")
-        for key, block in blocks.items():
-            logger.info(f"====Card: {key}====\n")
-            logger.info("\n".join(block) + "\n\n")
-        return blocks
+        if logger.isEnabledFor(logging.DEBUG):
+            # Joining every block is only worth it when someone reads it
+            for key, block in scan.blocks.items():
+                logger.debug("====Card: %s====\n", key)
+                logger.debug("%s\n\n", "\n".join(block))
+        return scan
+
+    def create_blocks(self, lines: List[str]) -> Dict[str, List[str]]:
+        return self.scan(lines).blocks
+
+    def extract_transactions(self, scan: StatementScan, table: TransactionTable, statement_date: Optional[str] = None) -> TransactionTable:
+        """Append every transaction row of the card blocks to a TransactionTable.
+
+        A row is a posting date line, its description lines, an optional foreign currency
+        line and a bare amount line ("12.34" or "12.34 CR"). Amounts that follow a summary
+        keyword (see SUMMARY_KEYWORDS) or have no posting date above them are skipped.
+        """
+        summary = self.get_summary_pattern()
+        amount_pattern = self.patterns.amount_pattern
+        count = len(table)
+        for card, block in scan.blocks.items():
+            posted, description, currency, after_summary = None, [], LOCAL_CURRENCY, False
+            # The first two lines are the card number line and its card name context
+            for line in block[2:]:
+                line = line.strip()
+                if not line:
+                    continue
+                amount = line[:-2].rstrip() if line.endswith("CR") else line
+                if amount_pattern.fullmatch(amount) and not any(c.isalpha() for c in amount):
+                    if posted is not None and not after_summary:
+                        table.append(self.config.name, card, statement_date, posted, " ".join(description),
+                                     to_cents(float(amount.replace(",", ""))), currency, amount != line)
+                    posted, description, currency, after_summary = None, [], LOCAL_CURRENCY, False
+                elif summary.search(line):
+                    posted, description, currency, after_summary = None, [], LOCAL_CURRENCY, True
+                elif POSTING_DATE_PATTERN.fullmatch(line):
+                    # Of a transaction date and a posting date, the later line wins
+                    posted = line
+                elif posted is not None:
+                    foreign = self.patterns.foreign_currencies.search(line)
+                    if foreign and amount_pattern.search(line):
+                        currency = foreign.group(0)
+                    else:
+                        description.append(line)
+        logger.info("extract_transactions: Extracted %s transactions", len(table) - count)
+        return table
 
     @abstractmethod
-    def process_block(self, block: List[str], full_text: List[str]) -> Dict[str, float]:
+    def process_block(self, block: List[str], full_text: List[str]) -> StatementRecord:
         """Bank-specific data extraction from a block"""
         pass
     
     @classmethod
-    def base_data(self):
-        return {
-            "card_name" : None,
-            "previous_balance": 0.00,
-            "credit_payment": 0.00,
-            "debit_fees": 0.00,
-            "retail_purchase": 0.00,
-            "balance_due": 0.00,
-            "minimum_payment": 0.00
-        }
+    def base_data(self) -> StatementRecord:
+        """Empty card summary, amounts are added up in cents on its attributes"""
+        return StatementRecord()
     
-    def extract_previous_balance(self, next_line: str, data: Dict[str, float]) -> None:
+    def extract_previous_balance(self, next_line: str, data: StatementRecord) -> None:
             amount = self.extract_amount(next_line.replace("CR", ""))
             if amount is not None:
-                data["previous_balance"] = -amount if "CR" in next_line else amount
-                logger.debug(f"Extracted previous balance: {data['previous_balance']}")
+                data.previous_balance = -to_cents(amount) if "CR" in next_line else to_cents(amount)
+                logger.debug("Extracted previous balance: %s", data['previous_balance'])
             else:
-                data["previous_balance"] = 0.00
+                data.previous_balance = 0
                 logger.debug("No amount found for previous balance.")
             
 
-    def extract_credit_payment(self, line:str, data:Dict[str,float]) -> None:
+    def extract_credit_payment(self, line:str, data:StatementRecord) -> None:
             amount = self.extract_amount(line.replace("CR", "") if "CR" in line else line)
             
             if amount is not None:
-                data["credit_payment"] -= amount
-                logger.debug(f"Extracted credit payment: {data["credit_payment"]}")
+                data.credit_payment -= to_cents(amount)
+                logger.debug("Extracted credit payment: %s", data["credit_payment"])
             else:
-                data["credit_payment"] -= 0.00
                 logger.debug("No amount found for credit payment.")
 
 
-    def extract_debit_fees(self, next_line:str, data:Dict[str,float]) -> None:
+    def extract_debit_fees(self, next_line:str, data:StatementRecord) -> None:
         
             amount = self.extract_amount(next_line)
             if amount is not None:
-                data["debit_fees"] += amount
-                logger.debug(f"Extracted debit fees: {data["debit_fees"]}")
+                data.debit_fees += to_cents(amount)
+                logger.debug("Extracted debit fees: %s", data["debit_fees"])
             else:
-                data["debit_fees"] = 0.00
+                data.debit_fees = 0
                 logger.debug("No amount found for debit fees.")
             
     
-    def extract_balance_due(self, next_line:str, data:Dict[str,float]) -> None:
+    def extract_balance_due(self, next_line:str, data:StatementRecord) -> None:
         amount = self.extract_amount(next_line.replace("CR", ""))
         if amount is not None:
-                data["balance_due"] = -amount if "CR" in next_line else amount
-                logger.debug(f"Extracted balance due: {data['balance_due']}")
+                data.balance_due = -to_cents(amount) if "CR" in next_line else to_cents(amount)
+                logger.debug("Extracted balance due: %s", data['balance_due'])
         else:
-            data["balance_due"] = 0.00
+            data.balance_due = 0
             logger.debug("No amount found for subtotal.")
 
-    def extract_minimum_payment(self, next_line:str, data:Dict[str,float]) -> None:
+    def extract_minimum_payment(self, next_line:str, data:StatementRecord) -> None:
         amount = self.extract_amount(next_line.replace("CR", ""))
         if amount is not None:
-                data["minimum_payment"] = -amount if "CR" in next_line else amount
-                logger.debug(f"Extracted balance due: {data['minimum_payment']}")
+                data.minimum_payment = -to_cents(amount) if "CR" in next_line else to_cents(amount)
+                logger.debug("Extracted balance due: %s", data['minimum_payment'])
         else:
-            data["minimum_payment"] = 0.00
+            data.minimum_payment = 0
             logger.debug("No amount found for minimum_payment.")
 
-    def extract_retail_purchase(self, line:str, data:Dict[str,float]) -> None:
+    def extract_retail_purchase(self, line:str, data:StatementRecord) -> None:
         amount = self.extract_amount(line)
         if amount and amount > 0:
-            data["retail_purchase"] += amount
-            logger.debug(f"Extracted retail purchase: {amount}")
+            data.retail_purchase += to_cents(amount)
+            logger.debug("Extracted retail purchase: %s", amount)
         else:
-            data["retail_purchase"] =+ 0.00
+            # Nothing to add, the total so far is kept
             logger.debug("No amount found for retail purchase.")
             
     def extract_amount(self, text: str) -> Optional[float]:
-        logger.debug(f"Extracting amount from text: {text}")
+        logger.debug("Extracting amount from text: %s", text)
         try:
-            match = re.search(self.config.amount_pattern, text)
+            match = self.patterns.amount_pattern.search(text)
             if match:
                 amount = float(match.group(1).replace(",", ""))
-                logger.debug(f"Extracted amount: {amount}")
+                logger.debug("Extracted amount: %s", amount)
                 return amount
             else:
-                logger.warning(f"No amount found in text: {text}")
+                logger.warning("No amount found in text: %s", text)
                 return None
         except Exception as e:
-            logger.error(f"Error extracting amount from text: {text}. Error: {e}")
+            logger.error("Error extracting amount from text: %s. Error: %s", text, e)
             return None
 
+    @staticmethod
+    def has_line(lines: List[str], index: int) -> bool:
+        """Bounds check that does not force a StreamedLines view to decode every page"""
+        try:
+            lines[index]
+            return True
+        except IndexError:
+            return False
+
     def date_dict(self) -> Dict[str,str]:
         return {
             "statement_date": "",
@@ -198,28 +466,28 @@ class BaseBank(ABC):
         }
 
     def extract_date(self, line:str) -> str:
-        logger.debug(f"Extracting date from line: {line}")
+        logger.debug("Extracting date from line: %s", line)
         try:
-            match = re.search(self.config.date_pattern, line)
+            match = self.patterns.date_pattern.search(line)
             if match:
                 date = match.group(1)
-                logger.debug(f"Extracted date: {date}")
+                logger.debug("Extracted date: %s", date)
                 return date
             else:
-                logger.warning(f"No date found in line: {line}")
+                logger.warning("No date found in line: %s", line)
                 return None
         except Exception as e:
-            logger.error(f"Error extracting date from line: {line}. Error: {e}")
+            logger.error("Error extracting date from line: %s. Error: %s", line, e)
 
 
     def is_amount_line(self, line: str) -> bool:
-        logger.debug(f"Checking if line is an amount: {line}")
+        logger.debug("Checking if line is an amount: %s", line)
         try:
             line = line.strip()
-            is_amount = (re.fullmatch(self.config.amount_pattern, line) is not None 
+            is_amount = (self.patterns.amount_pattern.fullmatch(line) is not None 
                          and not any(c.isalpha() for c in line))
-            logger.debug(f"Is amount line: {is_amount}")
+            logger.debug("Is amount line: %s", is_amount)
             return is_amount
         except Exception as e:
-            logger.error(f"Error checking if line is an amount: {line}. Error: {e}")
+            logger.error("Error checking if line is an amount: %s. Error: %s", line, e)
             return False
\ No newline at end of file
@@ -1,12 +1,19 @@
-from credit_card_tracker.app.banks.base_bank import BaseBank, BankConfig
-import re
+from credit_card_tracker.app.banks.base_bank import BaseBank, BankConfig, LineCategory, StatementScan, StatementRecord
 from typing import List, Dict, Optional
 from credit_card_tracker.logger import get_logger
 
 logger = get_logger(__name__)
 
 class RHB(BaseBank):
-    
+    # Foreign currency amounts are counted as retail purchases too
+    LINE_CATEGORIES = (
+        LineCategory.PREVIOUS_BALANCE,
+        LineCategory.CREDIT_PAYMENT,
+        LineCategory.DEBIT_FEES,
+        LineCategory.BALANCE_DUE,
+        LineCategory.RETAIL_AMOUNT,
+    )
+
     @classmethod
     def get_config(cls) -> BankConfig:
         logger.debug("Fetching RHB bank configuration.")
@@ -27,34 +34,34 @@ class RHB(BaseBank):
             
         )
 
-    def process_date(self, lines: List[str]) -> Dict[str,str]:
+    def process_date(self, lines: List[str], scan: StatementScan = None) -> Dict[str,str]:
         logger.debug("Processing statement and payment dates.")
         date = self.date_dict()
-        subset = lines[0:50]
-        i = 0
+        subset = lines[0:self.DATE_SCAN_LINES]
+        i = scan.date_start if scan else 0
         while i < len(subset):
             line = subset[i].strip()
             next_line = subset[i+1].strip()
-            logger.debug(f"processing line: {line}")
+            logger.debug("processing line: %s", line)
             try:
-                if any(kw in line for kw in self.config.statement_date_keyword):
+                if self.patterns.statement_date_keyword.search(line):
                     date["statement_date"] = self.extract_date(line)
-                    logger.debug(f"Extracted statement date : {date["statement_date"]}")
+                    logger.debug("Extracted statement date : %s", date["statement_date"])
                     
-                elif any(kw in line for kw in self.config.payment_date_keyword):
+                elif self.patterns.payment_date_keyword.search(line):
                     date["payment_date"] = self.extract_date(next_line)
-                    logger.debug(f"Extracted payment date : {date["payment_date"]}")
+                    logger.debug("Extracted payment date : %s", date["payment_date"])
                     i += 1
                 elif date["statement_date"] and date["payment_date"]:
                     logger.debug("Both statement and payment dates have been extracted, stopping further processing.")
                     break
             except Exception as e:
-                logger.error(f"Error processing line: {line}. Error: {e}")
+                logger.error("Error processing line: %s. Error: %s", line, e)
             i += 1  
-        logger.debug(f"Extracted dates: {date}")
+        logger.debug("Extracted dates: %s", date)
         return date
 
-    def process_block(self, block: List[str]) -> Dict[str, float]:
+    def process_block(self, block: List[str]) -> StatementRecord:
         logger.debug("Processing a block of financial data.")
         data = self.base_data()
 
@@ -62,59 +69,54 @@ class RHB(BaseBank):
         while i < len(block):
             line = block[i].strip()
             next_line = block[i+1].strip() if i+1 < len(block) else ""
-            logger.debug(f"Processing line: {line}")
+            logger.debug("Processing line: %s", line)
 
             try:
+                tag = self.classify_line(line, block[i-1])
+
                 # Previous Balance , amount on next line
-                if any(kw in line for kw in self.config.previous_balance_keywords):
+                if tag == LineCategory.PREVIOUS_BALANCE:
                     self.extract_previous_balance(next_line, data)
                     i += 1  # Skip next line since we've processed it
 
                 # Credit Payments (marked with "CR")
-                elif any(kw in line for kw in self.config.credit_payment_keywords):
+                elif tag == LineCategory.CREDIT_PAYMENT:
                     self.extract_credit_payment(line, data)
 
                 # Retail Interest/Fees
-                elif any(kw in line for kw in self.config.debit_fees_keywords):
+                elif tag == LineCategory.DEBIT_FEES:
                     self.extract_debit_fees(next_line, data)
                     
                     i += 1
 
                 # Subtotal/Balance Due
-                elif any(kw in line for kw in self.config.balance_due_keywords):
+                elif tag == LineCategory.BALANCE_DUE:
                     self.extract_balance_due(next_line, data)
                     i += 1
 
                 # Retail Purchases (individual transactions)
-                elif self.is_amount_line(line) :
+                elif tag == LineCategory.RETAIL_AMOUNT:
                     self.extract_retail_purchase(line, data)
 
             except Exception as e:
-                logger.error(f"Error processing line: {line}. Error: {e}")
+                logger.error("Error processing line: %s. Error: %s", line, e)
 
             i += 1
 
-        logger.debug(f"Processed block data: {data}")
-        for key in data:
-            if isinstance(data[key],(int,float)):
-                data[key] = round(data[key],2)
-                logger.info(f"Rounded amount : {data[key]}")
-        logger.info(f"Final rounded data: {data}")
+        logger.debug("Processed block data: %s", data)
         return data
         
     
-    def extract_minimum_payments_and_name_from_text(self, lines: List[str]) -> Dict[str, float]:
+    def extract_minimum_payments_and_name_from_text(self, lines: List[str], scan: StatementScan = None) -> Dict[str, float]:
         logger.debug("Extracting minimum payments and card name from text.")
         
         data =  {}
-        for i, line in enumerate(lines):
+        scan = scan or self.scan(lines)
+        for i, last4 in scan.card_anchors:
             
             try:
-                match = re.search(self.config.card_pattern, line)
-                if match and i + 4 < len(lines):
-                    
-                    last4 = match.group(2)
-                    logger.debug(f"Detected card number: {last4}")
+                if self.has_line(lines, i + 4):
+                    logger.debug("Detected card number: %s", last4)
                     if last4 not in data:
                         data[last4] = {}
                     amount = self.extract_amount(lines[i + 4])  
@@ -122,42 +124,40 @@ class RHB(BaseBank):
                     if amount is not None:
                         logger.info("Inserting amount into data dict")
                         data[last4]["minimum_payment"] = amount
-                        logger.debug(f"Extracted minimum payment for card {last4}: {amount}")
+                        logger.debug("Extracted minimum payment for card %s: %s", last4, amount)
                     text = lines[i+1]
-                    logger.info(f"Starting extracting card name from line: {text}")
-                    matches = re.findall(f"[A-Za-z]+", text)
-                    result = " ".join(matches).strip()
+                    logger.info("Starting extracting card name from line: %s", text)
+                    result = self.extract_card_name(text)
                     if result:
                         data[last4]["card_name"] = result
-                        logger.debug(f"Extracted card name for {last4}: {result}")
-                if any(end_kw in line for end_kw in self.config.end_keywords):
-                    break
+                        logger.debug("Extracted card name for %s: %s", last4, result)
             except Exception as e:
-                logger.error(f"Error extracting minimum payment from line: {line}. Error: {e}")
+                logger.error("Error extracting minimum payment near line: %s. Error: %s", lines[i], e)
 
         if not data:
             logger.warning("No minimum payments were extracted. Check if the input lines contain valid data.")
-        logger.debug(f"Extracted minimum payments and card name: {data}")
+        logger.debug("Extracted minimum payments and card name: %s", data)
         return data
 
-    def extract(self, lines: List[str]) -> Dict[str, Dict[str, float]]:
+    def extract(self, lines: List[str], scan: StatementScan = None) -> Dict[str, StatementRecord]:
         logger.debug("Starting extraction process.")
         try:
-            blocks = self.create_blocks(lines)
+            scan = scan or self.scan(lines)
+            blocks = scan.blocks
             results = {}
 
-            card = self.extract_minimum_payments_and_name_from_text(lines)
+            card = self.extract_minimum_payments_and_name_from_text(lines, scan)
             logger.debug("Loading card name and result which contains minimum payment and card name")
             # Process each card block
             for key, block in blocks.items():
                 results[key] = self.process_block(block)
                 if key in card:
-                    logger.info(f"adding min pay and card name")
+                    logger.info("adding min pay and card name")
                     results[key]["minimum_payment"] = card[key]["minimum_payment"]
                     results[key]["card_name"] = card[key]["card_name"]
-                    logger.info(f"Finished inserting card name and minimum payment for card:{key}")
-            logger.debug(f"Extraction results: {results}")
+                    logger.info("Finished inserting card name and minimum payment for card:%s", key)
+            logger.debug("Extraction results: %s", results)
             return results
         except Exception as e:
-            logger.error(f"Error during extraction: {e}")
+            logger.error("Error during extraction: %s", e)
             return{}
\ No newline at end of file
@@ -0,0 +1,76 @@
+from collections.abc import MutableMapping
+from typing import Iterator, Optional, Sequence, Tuple
+
+# Amount fields of a card summary, in the order they are written to the workbook and the ledger
+AMOUNT_KEYS: Tuple[str, ...] = ("previous_balance", "credit_payment", "debit_fees", "retail_purchase", "balance_due", "minimum_payment")
+RECORD_KEYS: Tuple[str, ...] = ("card_name",) + AMOUNT_KEYS
+_AMOUNTS = frozenset(AMOUNT_KEYS)
+
+
+def to_cents(amount: Optional[float]) -> int:
+    return round((amount or 0) * 100)
+
+
+class StatementRecord(MutableMapping):
+    """Summary of one card on one statement, with every amount held as integer cents.
+
+    The attributes are the cents (``record.balance_due == 12345``) and are what the
+    parsers add up, so totals are exact and need no rounding pass. Item access reads
+    and writes ringgit floats (``record["balance_due"] == 123.45``), which keeps the
+    record a drop-in for the dict base_data() used to return at the Excel, ledger and
+    GUI edge. Slots instead of a dict keep a batch of thousands of cards small.
+    """
+
+    __slots__ = RECORD_KEYS
+
+    def __init__(self, card_name: Optional[str] = None):
+        self.card_name = card_name
+        for key in AMOUNT_KEYS:
+            setattr(self, key, 0)
+
+    @classmethod
+    def from_cents(cls, card_name: Optional[str], cents: Sequence[int]) -> "StatementRecord":
+        """Record from amounts in cents, in AMOUNT_KEYS order"""
+        record = cls(card_name)
+        for key, value in zip(AMOUNT_KEYS, cents):
+            setattr(record, key, value)
+        return record
+
+    def cents(self) -> Tuple[int, ...]:
+        """Amounts in cents, in AMOUNT_KEYS order"""
+        return tuple(getattr(self, key) for key in AMOUNT_KEYS)
+
+    def __getitem__(self, key: str):
+        if key in _AMOUNTS:
+            return getattr(self, key) / 100
+        if key == "card_name":
+            return self.card_name
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in _AMOUNTS:
+            setattr(self, key, to_cents(value))
+        elif key == "card_name":
+            self.card_name = value
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError(f"StatementRecord fields cannot be removed: {key}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RECORD_KEYS)
+
+    def __len__(self) -> int:
+        return len(RECORD_KEYS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __getstate__(self) -> Tuple:
+        return (self.card_name,) + self.cents()
+
+    def __setstate__(self, state: Tuple) -> None:
+        self.card_name = state[0]
+        for key, value in zip(AMOUNT_KEYS, state[1:]):
+            setattr(self, key, value)
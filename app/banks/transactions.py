@@ -0,0 +1,118 @@
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional
+import numpy as np
+
+# Currency of every amount column, foreign amounts are converted by the bank
+LOCAL_CURRENCY = "MYR"
+
+
+class Transaction(NamedTuple):
+    bank: str
+    card: str
+    statement_date: Optional[str]
+    posted: Optional[str]
+    description: str
+    amount: int  # cents, always positive, see credit
+    currency: str
+    credit: bool
+
+
+class StringPool:
+    """Interned strings, each column stores the index instead of the string"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+        for value in values or []:
+            self.add(value)
+
+    def add(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.index[value] = code
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class TransactionTable:
+    """Transactions of any number of statements as parallel typed columns.
+
+    Bank, card, dates, descriptions and currencies are interned in string pools, so a
+    merchant that appears ten thousand times is stored once and each row is a handful of
+    integers. Amounts are integer cents and always positive, credits carry the credit
+    flag instead of a sign. Columns are array.array, np.frombuffer() views them without
+    a copy.
+
+        table = TransactionTable()
+        bank.extract_transactions(scan, table, dates["statement_date"])
+    """
+
+    # Pooled columns and the typecode of their index column
+    POOLED = {"bank": "H", "card": "I", "statement_date": "I", "posted": "I", "description": "I", "currency": "H"}
+    COLUMNS = ("bank", "card", "statement_date", "posted", "description", "amount", "currency", "credit")
+
+    def __init__(self):
+        self.pools: Dict[str, StringPool] = {name: StringPool() for name in self.POOLED}
+        self.columns: Dict[str, array] = {name: array(typecode) for name, typecode in self.POOLED.items()}
+        self.columns["amount"] = array("q")
+        self.columns["credit"] = array("b")
+
+    def append(self, bank_name: str, card: str, statement_date: Optional[str], posted: Optional[str], description: str,
+               amount: int, currency: str = LOCAL_CURRENCY, credit: bool = False) -> None:
+        row = {"bank": bank_name, "card": card, "statement_date": statement_date or "", "posted": posted or "",
+               "description": description, "currency": currency}
+        for name, value in row.items():
+            self.columns[name].append(self.pools[name].add(value))
+        self.columns["amount"].append(amount)
+        self.columns["credit"].append(1 if credit else 0)
+
+    def extend(self, other: "TransactionTable") -> None:
+        """Append every row of another table, e.g. one returned by a worker process"""
+        for name in self.POOLED:
+            codes = [self.pools[name].add(value) for value in other.pools[name].values]
+            self.columns[name].extend(codes[code] for code in other.columns[name])
+        self.columns["amount"].extend(other.columns["amount"])
+        self.columns["credit"].extend(other.columns["credit"])
+
+    def __len__(self) -> int:
+        return len(self.columns["amount"])
+
+    def values(self, name: str) -> List:
+        """Decoded values of one column"""
+        if name in self.POOLED:
+            pool = self.pools[name].values
+            return [pool[code] for code in self.columns[name]]
+        return list(self.columns[name])
+
+    def array(self, name: str) -> np.ndarray:
+        """Zero-copy NumPy view of a column, pooled columns as their codes"""
+        column = self.columns[name]
+        return np.frombuffer(column, dtype=column.typecode) if len(column) else np.zeros(0, dtype=column.typecode)
+
+    def rows(self) -> Iterator[Transaction]:
+        decoded = {name: self.pools[name].values for name in self.POOLED}
+        for i in range(len(self)):
+            row = {name: decoded[name][self.columns[name][i]] for name in self.POOLED}
+            yield Transaction(row["bank"], row["card"], row["statement_date"] or None, row["posted"] or None, row["description"],
+                              self.columns["amount"][i], row["currency"], bool(self.columns["credit"][i]))
+
+    def save(self, path: str) -> None:
+        """Write the columns and pools to a compressed .npz file"""
+        arrays = {name: self.array(name) for name in self.COLUMNS}
+        arrays.update({f"pool_{name}": np.array(pool.values, dtype=str) for name, pool in self.pools.items()})
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "TransactionTable":
+        table = cls()
+        with np.load(path, allow_pickle=False) as data:
+            for name in cls.POOLED:
+                table.pools[name] = StringPool(data[f"pool_{name}"].tolist())
+            for name in cls.COLUMNS:
+                table.columns[name].frombytes(data[name].astype(table.columns[name].typecode).tobytes())
+        return table
@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from credit_card_tracker.app.banks.transactions import TransactionTable
+from credit_card_tracker.app.processor_tools import ExcelManager, CreditCardProcessor, Ledger, WorkbookSession
+from credit_card_tracker.app.processor_tools.analytics import SpendAnalytics
+from credit_card_tracker.app.processor_tools.excel_export import export_ledger, export_statements
+from credit_card_tracker.app.processor_tools.replay import CHANGED, FAILED, NEW, UNCACHED, UNCHANGED, Replayer
+from credit_card_tracker.app.processor_tools.text_cache import TextCache
+from credit_card_tracker.app.processor_tools.excel_operations import statement_fingerprint
+from credit_card_tracker.app.processor_tools.tracker_reader import TrackerReader
+from credit_card_tracker.app.processor_tools.workbook_session import WorkbookLock
+from credit_card_tracker.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def find_pdfs(directory: str, recursive: bool = False) -> List[str]:
+    pdfs = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                pdfs.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return pdfs
+
+
+def parse_one(pdf_path: str, bank_name: Optional[str], passwords: Dict[str, str], password: Optional[str],
+              transactions: bool = False, pdf_sha256: Optional[str] = None) -> Dict:
+    """Process pool worker: parse one statement and report the outcome instead of raising.
+
+    Without a bank name the bank is detected from the statement. Encrypted PDFs are
+    tried with the default password first, then with each bank's password. With
+    ``transactions`` the outcome also carries a TransactionTable of the statement.
+    """
+    start = time.perf_counter()
+    outcome = {"pdf_path": pdf_path, "bank_name": bank_name, "results": None, "dates": None, "error": None,
+               "transactions": TransactionTable() if transactions else None, "pdf_sha256": pdf_sha256}
+    candidates = [passwords[bank_name]] if bank_name in passwords else [password] + [pw for pw in passwords.values() if pw != password]
+    try:
+        processor = CreditCardProcessor(bank_name)
+        for attempt, candidate in enumerate(candidates, start = 1):
+            try:
+                outcome["results"], outcome["dates"] = processor.parse_statement(pdf_path, bank_name, password = candidate, stream = True,
+                                                                                 transactions = outcome["transactions"])
+                break
+            except RuntimeError as e:
+                if "password" not in str(e).lower() or attempt == len(candidates):
+                    raise
+        outcome["bank_name"] = processor.bank_name
+        if not outcome["results"]:
+            outcome["error"] = "No card blocks found"
+    except Exception as e:
+        outcome["error"] = str(e)
+    outcome["seconds"] = time.perf_counter() - start
+    return outcome
+
+
+def write_workbook(excel_path: str, outcomes: List[Dict]) -> None:
+    """Insert every successfully parsed statement and rebuild Total, with a single save.
+
+    A new workbook is streamed out through write-only sheets instead.
+    """
+    statements = [(o["bank_name"], o["dates"], o["results"], o["pdf_sha256"]) for o in outcomes]
+    # Held across the exists check, so two runs cannot both create the workbook
+    with WorkbookLock(excel_path):
+        if not os.path.exists(excel_path):
+            export_statements(excel_path, statements)
+            return
+        ExcelManager.apply_statements(excel_path, statements)
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    passwords = {}
+    if args.passwords:
+        with open(args.passwords, "r") as f:
+            passwords = json.load(f)
+
+    pdfs = find_pdfs(args.directory, args.recursive)
+    if not pdfs:
+        print(f"No PDF files found in {args.directory}")
+        return 1
+
+    # PDFs already in the workbook, or repeated in the folder, are skipped before parsing
+    rows = []
+    if os.path.exists(args.output):
+        with TrackerReader(args.output) as reader:
+            rows = reader.ingested()
+    ingested = {row["PDF SHA-256"] for row in rows if row["PDF SHA-256"]}
+    fingerprints = {row["Fingerprint"] for row in rows if row["Fingerprint"]}
+    seen: Dict[str, str] = {}
+    jobs, skipped = [], []
+    for pdf_path in pdfs:
+        pdf_sha256 = TextCache.file_sha256(pdf_path)
+        if pdf_sha256 in ingested or pdf_sha256 in seen:
+            skipped.append(pdf_path)
+            print(f"  SKIP {os.path.basename(pdf_path)}: "
+                  + (f"already in {args.output}" if pdf_sha256 in ingested else f"same PDF as {os.path.basename(seen[pdf_sha256])}"))
+            continue
+        seen[pdf_sha256] = pdf_path
+        jobs.append((pdf_path, args.bank, passwords, args.password, bool(args.transactions), pdf_sha256))
+    outcomes = []
+
+    if not jobs:
+        print(f"Every statement in {args.directory} is already in {args.output}")
+        return 0
+
+    start = time.perf_counter()
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Parsing {len(jobs)} statements on {workers} workers...")
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        futures = [pool.submit(parse_one, *job) for job in jobs]
+        for future in as_completed(futures):
+            outcome = future.result()
+            outcomes.append(outcome)
+            status = "OK  " if outcome["error"] is None else "FAIL"
+            print(f"  {status} [{outcome['bank_name']}] {os.path.basename(outcome['pdf_path'])} ({outcome['seconds']:.2f}s)"
+                  + (f": {outcome['error']}" if outcome["error"] else ""))
+    parse_seconds = time.perf_counter() - start
+
+    outcomes.sort(key = lambda o: o["pdf_path"])
+    failed = [o for o in outcomes if o["error"] is not None]
+    # A different file of a statement already in the workbook (e.g. downloaded again) is only known once parsed
+    succeeded = []
+    for outcome in outcomes:
+        if outcome["error"] is not None:
+            continue
+        fingerprint = statement_fingerprint(outcome["bank_name"], outcome["dates"]["statement_date"], outcome["results"])
+        if fingerprint is None:
+            succeeded.append(outcome)  # undated, only its PDF hash could be checked
+            continue
+        if fingerprint in fingerprints:
+            skipped.append(outcome["pdf_path"])
+            print(f"  SKIP {os.path.basename(outcome['pdf_path'])}: same statement as one already in {args.output} or this batch")
+            continue
+        fingerprints.add(fingerprint)
+        succeeded.append(outcome)
+
+    write_seconds = 0.0
+    if succeeded:
+        write_start = time.perf_counter()
+        if args.ledger:
+            with Ledger(args.ledger) as ledger:
+                ledger.record_statements([(o["bank_name"], o["dates"], o["results"], o["pdf_sha256"], o["pdf_path"])
+                                          for o in succeeded])
+            print(f"Recorded {len(succeeded)} statements in {args.ledger}")
+        if args.transactions:
+            table = TransactionTable()
+            for outcome in succeeded:
+                table.extend(outcome["transactions"])
+            table.save(args.transactions)
+            print(f"Saved {len(table)} transactions to {args.transactions}")
+        write_workbook(args.output, succeeded)
+        write_seconds = time.perf_counter() - write_start
+        print(f"Wrote {len(succeeded)} statements to {args.output}")
+
+    total = len(outcomes)
+    print("")
+    print(f"Summary: {len(succeeded)} succeeded, {len(failed)} failed, {len(skipped)} skipped, {len(pdfs)} total")
+    for outcome in failed:
+        print(f"  FAIL {outcome['pdf_path']}: {outcome['error']}")
+    elapsed = parse_seconds + write_seconds
+    print(f"Parse: {parse_seconds:.2f}s  Excel: {write_seconds:.2f}s  "
+          f"Throughput: {total / elapsed if elapsed else 0:.1f} statements/s")
+    return 0 if not failed else 2
+
+
+def render_workbook(excel_path: str, ledger: Ledger, banks: List[str]) -> None:
+    """Generate the workbook from the ledger, or rebuild the given bank sheets and Total of an existing one"""
+    if not os.path.exists(excel_path):
+        count = export_ledger(excel_path, ledger)
+        print(f"Wrote {count} statements from {ledger.path} to {excel_path}")
+        return
+    with WorkbookSession(excel_path) as wb:
+        manager = None
+        for bank_name in banks:
+            manager = ExcelManager(bank_name, None, None)
+            count = manager.render_bank_sheet(wb, ledger)
+            print(f"Rendered {count} {bank_name} statements")
+        # Banks the ledger has never seen keep their rows: Total comes from the workbook's own sheets
+        manager.write_total_sheet(wb)
+    print(f"Updated {excel_path} from {ledger.path}")
+
+
+def run_render(args: argparse.Namespace) -> int:
+    with Ledger(args.ledger) as ledger:
+        banks = ledger.banks()
+        if not banks:
+            print(f"No statements in {ledger.path}")
+            return 1
+        render_workbook(args.output, ledger, args.banks or banks)
+    return 0
+
+
+def run_replay(args: argparse.Namespace) -> int:
+    passwords = {}
+    if args.passwords:
+        with open(args.passwords, "r") as f:
+            passwords = json.load(f)
+    cache = TextCache(args.cache) if args.cache else None
+
+    with Ledger(args.ledger) as ledger:
+        replayer = Replayer(ledger, cache, passwords, args.password)
+        start = time.perf_counter()
+        if args.directory:
+            outcomes = list(replayer.replay_files(find_pdfs(args.directory, args.recursive), args.bank))
+        else:
+            outcomes = list(replayer.replay_ledger(args.bank))
+        elapsed = time.perf_counter() - start
+        if not outcomes:
+            print(f"No statements to replay in {args.directory or ledger.path}")
+            return 1
+
+        counts = {status: 0 for status in (CHANGED, NEW, UNCHANGED, UNCACHED, FAILED)}
+        for outcome in outcomes:
+            counts[outcome.status] += 1
+            name = os.path.basename(outcome.source) if outcome.source else outcome.pdf_sha256[:12] if outcome.pdf_sha256 else "?"
+            if outcome.status == CHANGED:
+                print(f"  CHANGED [{outcome.bank_name}] {name}")
+                for change in outcome.changes:
+                    print(f"      {change}")
+            elif outcome.status == NEW:
+                print(f"  NEW     [{outcome.bank_name}] {name}")
+            elif outcome.status == UNCACHED:
+                print(f"  UNCACHED [{outcome.bank_name}] {name}: {outcome.error}")
+            elif outcome.status == FAILED:
+                print(f"  FAIL    [{outcome.bank_name}] {name}: {outcome.error}")
+
+        replayed = len(outcomes) - counts[UNCACHED]
+        extracted = sum(outcome.extracted for outcome in outcomes)
+        print("")
+        print(f"Summary: {counts[CHANGED]} changed, {counts[NEW]} new, {counts[UNCHANGED]} unchanged, "
+              f"{counts[UNCACHED]} not replayed, {counts[FAILED]} failed, {len(outcomes)} total")
+        if extracted:
+            print(f"Decoded {extracted} statements from their PDF, their text was not cached")
+        print(f"Replay: {elapsed:.2f}s  Parse: {replayer.seconds:.2f}s  "
+              f"Throughput: {replayed / elapsed if elapsed else 0:.1f} statements/s")
+
+        if args.dry_run:
+            return 0 if not counts[FAILED] else 2
+        banks = replayer.record(outcomes)
+        if banks:
+            print(f"Recorded {counts[CHANGED] + counts[NEW]} statements in {ledger.path}")
+        if args.output and (banks or not os.path.exists(args.output)):
+            render_workbook(args.output, ledger, banks)
+    return 0 if not counts[FAILED] else 2
+
+
+def run_analytics(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    if args.workbook:
+        analytics = SpendAnalytics.from_workbook(args.workbook)
+        source = args.workbook
+    else:
+        with Ledger(args.ledger) as ledger:
+            analytics = SpendAnalytics.from_ledger(ledger)
+            source = ledger.path
+    if not analytics.months:
+        print(f"No dated statements in {source}")
+        return 1
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if args.query == "spend":
+        series = analytics.spend(args.bank, args.by)
+    elif args.query == "fees":
+        series = analytics.fee_trend(args.bank, args.by)
+    elif args.query == "utilisation":
+        series = analytics.utilisation(args.bank, args.by)
+    else:
+        series = analytics.metric(args.query, args.bank, args.by)
+    if args.rolling:
+        series = analytics.rolling(series, args.rolling)
+    series = series.last(args.months)
+    query_seconds = time.perf_counter() - start
+
+    width = max([len(label) for label in series.labels] + [5])
+    print(f"{'':<{width}} " + " ".join(f"{month:>10}" for month in series.months))
+    for label, row in zip(series.labels, series.values):
+        print(f"{label:<{width}} " + " ".join(f"{'-' if value != value else format(value, ',.2f'):>10}" for value in row))
+    print(f"\n{len(analytics.cards)} cards over {len(analytics.months)} months from {source}  "
+          f"Load: {load_seconds * 1000:.1f}ms  Query: {query_seconds * 1000:.2f}ms")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog = "credit_card_tracker", description = "Statement Analyser command line tools")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+
+    batch = subparsers.add_parser("batch", help = "Parse a folder of statements into one workbook")
+    batch.add_argument("directory", help = "Folder containing statement PDFs")
+    batch.add_argument("-o", "--output", required = True, help = "Workbook to create or update")
+    batch.add_argument("--bank", choices = list(CreditCardProcessor.BANK_CLASSES.keys()),
+                       help = "Bank of every PDF (default: detected from each statement)")
+    batch.add_argument("--password", help = "Password for encrypted PDFs")
+    batch.add_argument("--passwords", help = "JSON file mapping bank name to PDF password")
+    batch.add_argument("-w", "--workers", type = int, default = 0, help = "Parser processes (default: one per CPU)")
+    batch.add_argument("-r", "--recursive", action = "store_true", help = "Include sub-folders")
+    batch.add_argument("--ledger", help = "Also record the statements in this ledger database")
+    batch.add_argument("--transactions", help = "Also save every transaction row to this .npz file")
+    batch.set_defaults(func = run_batch)
+
+    render = subparsers.add_parser("render", help = "Generate a workbook, or rebuild its sheets, from the ledger")
+    render.add_argument("-o", "--output", required = True, help = "Workbook to create or update")
+    render.add_argument("--ledger", help = f"Ledger database (default: {Ledger.DEFAULT_PATH})")
+    render.add_argument("--banks", nargs = "+", choices = list(CreditCardProcessor.BANK_CLASSES.keys()),
+                        help = "Bank sheets to rebuild in an existing workbook (default: every bank in the ledger)")
+    render.set_defaults(func = run_render)
+
+    replay = subparsers.add_parser("replay", help = "Parse statements again from cached text after a parser change")
+    replay.add_argument("directory", nargs = "?", help = "Folder of statement PDFs (default: every statement in the ledger)")
+    replay.add_argument("--ledger", help = f"Ledger to compare with and update (default: {Ledger.DEFAULT_PATH})")
+    replay.add_argument("-o", "--output", help = "Also generate this workbook, or rebuild its changed bank sheets, from the ledger")
+    replay.add_argument("--bank", choices = list(CreditCardProcessor.BANK_CLASSES.keys()),
+                        help = "Only this bank's ledger statements, or the bank of every PDF in the folder")
+    replay.add_argument("--password", help = "Password for encrypted PDFs")
+    replay.add_argument("--passwords", help = "JSON file mapping bank name to PDF password")
+    replay.add_argument("--cache", help = "Text cache folder (default: the one batch and the GUI use)")
+    replay.add_argument("-r", "--recursive", action = "store_true", help = "Include sub-folders")
+    replay.add_argument("--dry-run", action = "store_true", help = "Only report what changed, leave the ledger and workbook alone")
+    replay.set_defaults(func = run_replay)
+
+    analytics = subparsers.add_parser("analytics", help = "Monthly trends per card or bank over the parsed history")
+    analytics.add_argument("query", choices = ["spend", "fees", "utilisation", "previous_balance", "credit_payment", "balance_due", "minimum_payment"],
+                           help = "spend: retail purchases, fees: interest and fees, utilisation: balance due / minimum payment, "
+                                  "or any statement amount")
+    source = analytics.add_mutually_exclusive_group()
+    source.add_argument("--ledger", help = f"Ledger database (default: {Ledger.DEFAULT_PATH})")
+    source.add_argument("--workbook", help = "Read the history from a tracker workbook instead of the ledger")
+    analytics.add_argument("--bank", choices = list(CreditCardProcessor.BANK_CLASSES.keys()), help = "Only this bank's cards")
+    analytics.add_argument("--by", choices = ["card", "bank"], default = "card", help = "One row per card (default) or per bank")
+    analytics.add_argument("--rolling", type = int, default = 0, help = "Show the rolling mean over this many months")
+    analytics.add_argument("--months", type = int, default = 12, help = "Months to show, most recent last (default: 12)")
+    analytics.set_defaults(func = run_analytics)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
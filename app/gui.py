@@ -1,11 +1,14 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from credit_card_tracker.app.processor_tools import ExcelManager, CreditCardProcessor
+from credit_card_tracker.app.processor_tools.tracker_reader import ingested_hashes
 from credit_card_tracker.logger import get_logger
 
 logger = get_logger(__name__)
 
 class CreditCardGUI:
+    AUTO_DETECT = "Auto-detect"
+
     def __init__(self, root):
         self.root = root
         self.root.title("Statement Analyser")
@@ -23,7 +26,8 @@ class CreditCardGUI:
         tk.Label(self.root, text="Select Bank:").pack(pady=5)
         self.bank_var = tk.StringVar()
         self.bank_dropdown = ttk.Combobox(self.root, textvariable=self.bank_var, state="readonly")
-        self.bank_dropdown['values'] = list(CreditCardProcessor.BANK_CLASSES.keys())
+        self.bank_dropdown['values'] = [self.AUTO_DETECT] + list(CreditCardProcessor.BANK_CLASSES.keys())
+        self.bank_dropdown.current(0)
         self.bank_dropdown.pack()
 
         # PDF selection
@@ -79,7 +83,7 @@ class CreditCardGUI:
             "Welcome to Statement Analyser!\n\n"
             "This program helps you extract key financial information from your credit card statements and\n"
             "paste them into an excel file for easy tracking.\n\n"
-            "1. Select your bank and statement PDF.\n\n"
+            "1. Select your bank (or leave it on Auto-detect) and statement PDF.\n\n"
             "2. Enter password if needed.\n\n"
             "3. Choose to create a new Excel file or update an existing one (only after you have created an excel file).\n\n"
             "4. For updating credit card of same bank, reselect new pdf and click update excel.A 2nd record will appear on the excel sheet with name of bank\n\n"
@@ -141,20 +145,24 @@ class CreditCardGUI:
             messagebox.showerror("Missing Info", "Please select a bank and PDF file.")
             return
         try:
+            if bank == self.AUTO_DETECT:
+                bank = None
             self.processor = CreditCardProcessor(bank)
+            # When updating, a PDF that is already in the workbook is caught before it is decoded
+            ingested = ingested_hashes(self.excel_entry.get() if self.excel_mode.get() == "u" else None)
          
-            logger.info(f"Processor initialised for bank: {bank}")
+            logger.info("Processor initialised for bank: %s", bank)
             # Show result in text area
             self.result_text.config(state="normal")
             self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Parsing {pdf_path} for {bank}...\n")
+            self.result_text.insert(tk.END, f"Parsing {pdf_path} for {bank or 'auto-detected bank'}...\n")
             # Password handling loop
             while True:
                 try:
-                    result, dates = self.processor.parse_statement(pdf_path,bank, password=password)
+                    result, dates = self.processor.parse_statement(pdf_path,bank, password=password, stream=True, ingested=ingested)
                     break
                 except Exception as e:
-                    logger.error(f"Error parsing statement: {e}")
+                    logger.error("Error parsing statement: %s", e)
                     if "password" in str(e).lower() or "decrypt" in str(e).lower():
                         password = self.prompt_password("Incorrect password. Please re-enter the PDF password:")
                         if password is None:
@@ -165,9 +173,23 @@ class CreditCardGUI:
                         self.password_entry.delete(0, tk.END)
                         self.password_entry.insert(0, password)
                         continue
+                    elif "DUPLICATE STATEMENT" in str(e):
+                        self.status_label.config(text="This statement is already in the Excel file.", fg="red")
+                        messagebox.showwarning("Duplicate", "This statement is already in the Excel file, nothing to update.")
+                        self.result_text.insert(tk.END, "Statement already in the Excel file.\n")
+                        self.result_text.config(state="disabled")
+                        return
                     elif "PDF MATCHING ERROR" in str(e):
-                        self.status_label.config(text=f"PDF matching error. Please choose the correct pdf for bank: {bank}.")
-                        messagebox.showerror("Error", f"PDF matching error. Please choose the correct pdf for bank: {bank}.")
+                        # bank is None in auto-detect mode, the parser could not tell which bank the PDF is from
+                        if bank:
+                            user_msg = f"PDF matching error. Please choose the correct pdf for bank: {bank}."
+                        else:
+                            user_msg = "PDF matching error. Could not identify the bank of this statement, please choose its bank."
+                        detected = str(e).partition("statement looks like ")[2].rstrip(")")
+                        if detected:
+                            user_msg += f" The statement looks like {detected}."
+                        self.status_label.config(text=user_msg)
+                        messagebox.showerror("Error", user_msg)
                         pdf_path = self.pdf_entry.get()
                         return
                     else:
@@ -176,15 +198,16 @@ class CreditCardGUI:
                         self.result_text.insert(tk.END, f"Error: {e}\n")
                         self.result_text.config(state="disabled")
                         return
+            bank = self.processor.bank_name
             self.result = result
             self.dates = dates
             formatted = self.format_results(result, dates)
             self.result_text.insert(tk.END, formatted + "\n")
             self.result_text.config(state="disabled")
             self.status_label.config(text="Statement parsed successfully.", fg="green")
-            self.excel_manager = ExcelManager(self.processor.bank_name, dates, result)
+            self.excel_manager = ExcelManager(self.processor.bank_name, dates, result, pdf_sha256=self.processor.pdf_sha256)
         except Exception as e:
-            logger.error(f"Error parsing statement: {e}")
+            logger.error("Error parsing statement: %s", e)
             self.status_label.config(text=f"Error: {e}", fg="red")
             messagebox.showerror("Error", str(e))
 
@@ -246,10 +269,12 @@ class CreditCardGUI:
                     self.status_label.config(text=f"Bank sheet detected, successfully updated it", fg="green")
                     messagebox.showinfo("Success", f"Bank sheet detected, successfully updated it")
         except Exception as e:
-            logger.error(f"gui: Excel operation failed: {e}")
+            logger.error("gui: Excel operation failed: %s", e)
             error_msg = str(e)
             if "already exists" in error_msg.lower():
                 user_msg = ("Worksheet for this bank already exists. Please retry and choose 'No' when asked after choosing update existing excel.")
+            elif "DUPLICATE STATEMENT" in error_msg:
+                user_msg = "This statement is already in the Excel file, nothing was changed."
             elif "permission denied" in error_msg.lower():
                 user_msg = "Permission denied. Please close the Excel file if it is opened"
             elif "not found in the workbook" in error_msg.lower():
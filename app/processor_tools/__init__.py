@@ -1,5 +1,8 @@
 from .excel_operations import ExcelManager
+from .workbook_session import WorkbookSession
+from .ledger import Ledger
+from .tracker_reader import TrackerReader
 from .text_extractor import TextExtractor
 from .statement_processor import CreditCardProcessor  
 
-__all__ = ['ExcelManager', 'TextExtractor', 'CreditCardProcessor']
\ No newline at end of file
+__all__ = ['ExcelManager', 'WorkbookSession', 'Ledger', 'TrackerReader', 'TextExtractor', 'CreditCardProcessor']
\ No newline at end of file
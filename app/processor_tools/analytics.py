@@ -0,0 +1,142 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from credit_card_tracker.app.banks.statement_record import AMOUNT_KEYS, StatementRecord, to_cents
+from credit_card_tracker.app.processor_tools.ledger import Ledger, iso_date
+from credit_card_tracker.app.processor_tools.tracker_reader import TrackerReader
+from credit_card_tracker.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Series(NamedTuple):
+    """Result of a query: one row per label, one column per month, NaN where there is no statement"""
+    labels: List[str]
+    months: List[str]
+    values: np.ndarray
+
+    def last(self, months: int) -> "Series":
+        return Series(self.labels, self.months[-months:], self.values[:, -months:])
+
+
+def card_matrix(results: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """cards × metrics amounts of one statement, in integer cents"""
+    return np.array([values.cents() if isinstance(values, StatementRecord) else [to_cents(values[key]) for key in AMOUNT_KEYS]
+                     for values in results.values()], dtype=np.int64).reshape(len(results), len(AMOUNT_KEYS))
+
+
+def month_range(first: str, last: str) -> List[str]:
+    """Every "YYYY-MM" from first to last"""
+    year, month = int(first[:4]), int(first[5:7])
+    months = []
+    while True:
+        months.append(f"{year:04d}-{month:02d}")
+        if months[-1] >= last:
+            return months
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class SpendAnalytics:
+    """Parsed statement history as a cards × months × metrics array of cents.
+
+    Cards are (bank, card number) pairs and months run without gaps from the first to the
+    last statement month, so trends and rolling windows are plain array operations.
+    ``present`` marks the (card, month) cells that have a statement. A second statement
+    of the same card in one month replaces the first.
+
+        analytics = SpendAnalytics.from_ledger(ledger)
+        analytics.spend(by="bank").last(12)
+    """
+
+    def __init__(self, cards: List[Tuple[str, str]], months: List[str], values: np.ndarray, present: np.ndarray):
+        self.cards = cards
+        self.months = months
+        self.values = values
+        self.present = present
+
+    @classmethod
+    def from_statements(cls, statements: Iterable[Tuple[str, Dict[str, str], Dict[str, Dict[str, float]]]]) -> "SpendAnalytics":
+        """Build from (bank_name, dates, results) statements, e.g. Ledger.statements()"""
+        columns: Dict[Tuple[str, str], int] = {}
+        cells: Dict[Tuple[int, str], np.ndarray] = {}
+        skipped = 0
+        for bank_name, dates, results in statements:
+            statement_on = iso_date(dates.get("statement_date"))
+            if statement_on is None:
+                skipped += 1
+                continue
+            month = statement_on[:7]
+            for card, cents in zip(results, card_matrix(results)):
+                cells[(columns.setdefault((bank_name, card), len(columns)), month)] = cents
+        if skipped:
+            logger.warning("from_statements: Skipped %s statements without a readable statement date", skipped)
+
+        months = month_range(min(month for _, month in cells), max(month for _, month in cells)) if cells else []
+        month_index = {month: i for i, month in enumerate(months)}
+        values = np.zeros((len(columns), len(months), len(AMOUNT_KEYS)), dtype=np.int64)
+        present = np.zeros((len(columns), len(months)), dtype=bool)
+        if cells:
+            rows = np.array([card for card, _ in cells])
+            cols = np.array([month_index[month] for _, month in cells])
+            values[rows, cols] = np.stack(list(cells.values()))
+            present[rows, cols] = True
+        logger.info("from_statements: %s cards over %s months", len(columns), len(months))
+        return cls(list(columns), months, values, present)
+
+    @classmethod
+    def from_ledger(cls, ledger: Ledger) -> "SpendAnalytics":
+        return cls.from_statements(ledger.statements())
+
+    @classmethod
+    def from_workbook(cls, excel_path: str) -> "SpendAnalytics":
+        with TrackerReader(excel_path) as reader:
+            return cls.from_statements((record.bank, {"statement_date": record.statement_date}, record.results)
+                                       for record in reader.records())
+
+    def _select(self, bank_name: Optional[str]) -> np.ndarray:
+        return np.array([bank_name is None or bank == bank_name for bank, _ in self.cards], dtype=bool)
+
+    def metric(self, metric: str, bank_name: Optional[str] = None, by: str = "card") -> Series:
+        """Amounts of one metric per card, or summed per bank, per month"""
+        selected = self._select(bank_name)
+        cents = self.values[selected, :, AMOUNT_KEYS.index(metric)]
+        present = self.present[selected]
+        cards = [card for card, keep in zip(self.cards, selected) if keep]
+        if by == "bank":
+            banks = list(dict.fromkeys(bank for bank, _ in cards))
+            group = np.array([banks.index(bank) for bank, _ in cards], dtype=np.intp)
+            sums = np.zeros((len(banks), len(self.months)), dtype=np.int64)
+            counts = np.zeros((len(banks), len(self.months)), dtype=np.int64)
+            np.add.at(sums, group, cents)
+            np.add.at(counts, group, present)
+            return Series(banks, self.months, np.where(counts > 0, sums / 100, np.nan))
+        return Series([f"{bank} {card}" for bank, card in cards], self.months, np.where(present, cents / 100, np.nan))
+
+    def spend(self, bank_name: Optional[str] = None, by: str = "card") -> Series:
+        """Retail purchases per month"""
+        return self.metric("retail_purchase", bank_name, by)
+
+    def fee_trend(self, bank_name: Optional[str] = None, by: str = "bank") -> Series:
+        """Interest and fees per month"""
+        return self.metric("debit_fees", bank_name, by)
+
+    def utilisation(self, bank_name: Optional[str] = None, by: str = "card") -> Series:
+        """Balance due as a multiple of the minimum payment, NaN where no minimum payment is due"""
+        balance_due = self.metric("balance_due", bank_name, by)
+        minimum_payment = self.metric("minimum_payment", bank_name, by).values
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(minimum_payment > 0, balance_due.values / minimum_payment, np.nan)
+        return Series(balance_due.labels, balance_due.months, ratio)
+
+    @staticmethod
+    def rolling(series: Series, window: int = 3) -> Series:
+        """Mean over the last ``window`` months, counting only months with a statement"""
+        filled = np.nan_to_num(series.values)
+        counts = (~np.isnan(series.values)).astype(np.int64)
+        zeros = np.zeros((len(series.labels), 1))
+        sums = np.concatenate([zeros, filled.cumsum(axis=1)], axis=1)
+        seen = np.concatenate([zeros, counts.cumsum(axis=1)], axis=1)
+        start = np.maximum(np.arange(1, len(series.months) + 1) - window, 0)
+        window_sums = sums[:, 1:] - sums[:, start]
+        window_counts = seen[:, 1:] - seen[:, start]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return Series(series.labels, series.months, np.where(window_counts > 0, window_sums / window_counts, np.nan))
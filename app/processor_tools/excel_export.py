@@ -0,0 +1,150 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from credit_card_tracker.app.processor_tools.excel_operations import (INDEX_HEADERS, INDEX_SHEET, INGESTED_HEADERS, INGESTED_SHEET,
+                                                                      TOTAL_HEADERS, TOTAL_SHEET, record_block, record_row,
+                                                                      statement_fingerprint)
+from credit_card_tracker.app.processor_tools.ledger import Ledger
+from credit_card_tracker.app.processor_tools.excel_styles import BOLD_STYLE, CELL_STYLE, register_styles
+from credit_card_tracker.app.processor_tools.workbook_session import WorkbookLock, save_atomic
+from credit_card_tracker.logger import get_logger
+
+logger = get_logger(__name__)
+
+class StreamingExporter:
+    """Bulk export of statements into a new workbook through openpyxl write-only sheets.
+
+    Records are written row by row in the same 9-row layout as ExcelManager, so memory
+    stays flat however many statements are exported. Only the latest record per bank
+    is kept for the Total sheet and the hidden record index, both written on close().
+    A statement whose fingerprint or PDF hash was already exported is skipped.
+
+    Write-only sheets take column widths before their first row, so card columns up to
+    ``card_columns`` (a count, or a count per bank name) get the usual width when the
+    bank sheet is created.
+    """
+
+    DEFAULT_CARD_COLUMNS = 6
+
+    def __init__(self, excel_path: str, card_columns: Union[int, Dict[str, int]] = DEFAULT_CARD_COLUMNS):
+        self.excel_path = excel_path
+        self.card_columns = card_columns
+        self.wb = Workbook(write_only=True)
+        register_styles(self.wb)
+        self.sheets: Dict[str, WriteOnlyWorksheet] = {}
+        self.record_counts: Dict[str, int] = {}
+        self.latest: Dict[str, Tuple[int, str, float, float, str]] = {}
+        self.ingested: List[List] = []
+        self.fingerprints = set()
+        self.hashes = set()
+
+    def _sheet(self, bank_name: str) -> WriteOnlyWorksheet:
+        ws = self.sheets.get(bank_name)
+        if ws is None:
+            logger.info("_sheet: Creating write-only sheet %s", bank_name)
+            ws = self.wb.create_sheet(bank_name)
+            for column, width in (("A", 10), ("B", 17), ("C", 17), ("D", 12)):
+                ws.column_dimensions[column].width = width
+            if isinstance(self.card_columns, dict):
+                card_columns = self.card_columns.get(bank_name, self.DEFAULT_CARD_COLUMNS)
+            else:
+                card_columns = self.card_columns
+            for col in range(5, 5 + card_columns):
+                ws.column_dimensions[get_column_letter(col)].width = 20
+            ws.append([])  # records start on row 2
+            self.sheets[bank_name] = ws
+            self.record_counts[bank_name] = 0
+        return ws
+
+    def _cell(self, ws: WriteOnlyWorksheet, value, style: str = CELL_STYLE) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value)
+        cell.style = style
+        return cell
+
+    def write_statement(self, bank_name: str, date: Dict[str, str], results: Dict[str, Dict[str, float]],
+                        pdf_sha256: Optional[str] = None) -> Optional[int]:
+        """Append one statement as the next record of its bank sheet, returns its record number or None for a duplicate"""
+        fingerprint = statement_fingerprint(bank_name, date["statement_date"], results)
+        if fingerprint in self.fingerprints or pdf_sha256 in self.hashes:
+            logger.warning("write_statement: Skipping duplicate %s statement of %s", bank_name, date["statement_date"])
+            return None
+        if fingerprint:
+            self.fingerprints.add(fingerprint)
+        if pdf_sha256:
+            self.hashes.add(pdf_sha256)
+        ws = self._sheet(bank_name)
+        record_no = self.record_counts[bank_name] + 1
+        self.record_counts[bank_name] = record_no
+        rows, totals = record_block(record_no, date, results)
+        ws.row_dimensions[record_row(record_no)].height = 26
+        for cells in rows:
+            ws.append([self._cell(ws, value, style) for value, style in cells])
+        ws.append([])  # blank separator row
+
+        if fingerprint or pdf_sha256:
+            self.ingested.append([fingerprint, pdf_sha256, bank_name, date["statement_date"], record_no])
+        self.latest[bank_name] = (record_no, date["statement_date"], totals["balance_due"], totals["minimum_payment"],
+                                  date["payment_date"])
+        logger.debug("write_statement: Wrote record %s of %s", record_no, bank_name)
+        return record_no
+
+    def close(self) -> None:
+        """Write the Total sheet, the record index and the ingested statements, then save"""
+        ws_total = self.wb.create_sheet(TOTAL_SHEET)
+        for column, width in (("A", 17), ("B", 15), ("C", 15), ("D", 20)):
+            ws_total.column_dimensions[column].width = width
+        ws_total.append([self._cell(ws_total, header, BOLD_STYLE) for header in TOTAL_HEADERS])
+        for bank_name, (_, _, balance_due, minimum_payment, payment_date) in self.latest.items():
+            ws_total.append([self._cell(ws_total, bank_name, BOLD_STYLE), self._cell(ws_total, balance_due),
+                             self._cell(ws_total, minimum_payment), self._cell(ws_total, payment_date)])
+        ws_index = self.wb.create_sheet(INDEX_SHEET)
+        ws_index.sheet_state = "hidden"
+        ws_index.append(INDEX_HEADERS)
+        for bank_name, (record_no, statement_date, balance_due, minimum_payment, payment_date) in self.latest.items():
+            ws_index.append([bank_name, record_no, record_row(record_no), statement_date, balance_due, minimum_payment, payment_date])
+        ws_ingested = self.wb.create_sheet(INGESTED_SHEET)
+        ws_ingested.sheet_state = "hidden"
+        ws_ingested.append(INGESTED_HEADERS)
+        for row in self.ingested:
+            ws_ingested.append(row)
+        with WorkbookLock(self.excel_path):
+            save_atomic(self.wb, self.excel_path)
+        logger.info("close: Exported %s records to %s", sum(self.record_counts.values()), self.excel_path)
+
+    def __enter__(self) -> "StreamingExporter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.close()
+        else:
+            logger.warning("StreamingExporter: Export to %s abandoned after error: %s", self.excel_path, exc)
+        return False
+
+
+def export_statements(excel_path: str, statements: Iterable[Tuple], card_columns: Optional[Union[int, Dict[str, int]]] = None) -> int:
+    """Write (bank_name, dates, results[, pdf_sha256]) statements into a new workbook, returns the record count.
+
+    Without ``card_columns`` a list of statements is scanned for each bank's widest record
+    first, any other iterable is consumed lazily with the default width columns.
+    """
+    if card_columns is None:
+        card_columns = StreamingExporter.DEFAULT_CARD_COLUMNS
+        if isinstance(statements, list):
+            card_columns = {}
+            for bank_name, _, results, *_ in statements:
+                card_columns[bank_name] = max(card_columns.get(bank_name, 0), len(results))
+    count = 0
+    with StreamingExporter(excel_path, card_columns) as exporter:
+        for bank_name, date, results, *rest in statements:
+            if exporter.write_statement(bank_name, date, results, *rest) is not None:
+                count += 1
+    return count
+
+
+def export_ledger(excel_path: str, ledger: Ledger) -> int:
+    """Generate a new workbook from every statement in the ledger, returns the record count"""
+    return export_statements(excel_path, ((bank_name, dates, results, pdf_sha256) for pdf_sha256, _, bank_name, dates, results in ledger.archive()),
+                             ledger.max_cards())
@@ -1,207 +1,468 @@
+import os
 from openpyxl.worksheet import worksheet
-from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
 from openpyxl import Workbook
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple
+from credit_card_tracker.app.banks.statement_record import AMOUNT_KEYS
+from credit_card_tracker.app.processor_tools.ledger import Ledger, iso_date
+from credit_card_tracker.app.processor_tools.excel_styles import BOLD_STYLE, CARD_NAME_STYLE, CELL_STYLE, register_styles
+from credit_card_tracker.app.processor_tools.workbook_session import WorkbookSession
 from credit_card_tracker.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Each statement is a 9-row record: 8 rows of labels and amounts plus a blank separator
+RECORD_ROWS = 9
+ROW_LABELS = ["Card Name","Card No.", "Previous Balance", "Credit Payment", "Debit Fees", "Retail Purchases", "Balance Due", "Minimum Payment"]
+TOTAL_HEADERS = ["Bank", "Balance Due", "Minimum Payment", "Payment Due Date"]
+TOTAL_SHEET = "Total"
+# Hidden sheet with the latest record of every bank sheet, see RecordIndex
+INDEX_SHEET = "_index"
+INDEX_HEADERS = ["Bank", "Record No.", "Row", "Statement Date", "Balance Due", "Minimum Payment", "Payment Due Date"]
+# Index fields shown on the Total sheet, in Total column order from B
+TOTAL_FIELDS = ["Balance Due", "Minimum Payment", "Payment Due Date"]
+# Hidden sheet with the fingerprint of every statement written, see IngestIndex
+INGESTED_SHEET = "_ingested"
+INGESTED_HEADERS = ["Fingerprint", "PDF SHA-256", "Bank", "Statement Date", "Record No."]
+# Hidden bookkeeping sheets, always kept after the bank sheets and Total
+HIDDEN_SHEETS = (INDEX_SHEET, INGESTED_SHEET)
+
+
+def record_row(record_no: int) -> int:
+    """First row of a record"""
+    return 2 + (record_no - 1) * RECORD_ROWS
+
+
+def record_block(record_no: int, date: Dict[str, str], results: Dict[str, Dict[str, float]]) -> Tuple[List[List[Tuple]], Dict[str, float]]:
+    """(value, style name) of every cell in the 8 rows of a record from column A, and the record totals"""
+    cards = list(results.items())
+    totals = {key: 0 for key in AMOUNT_KEYS}
+    for _, values in cards:
+        for key in AMOUNT_KEYS:
+            totals[key] += values[key]
+
+    # Column A/B content of the record rows, column D holds the totals
+    left = {0: ("Record No.", "Statement Date"), 1: (record_no, date["statement_date"]),
+            6: (None, "Payment Due Date"), 7: (None, date["payment_date"])}
+    rows = []
+    for offset, label in enumerate(ROW_LABELS):
+        a, b = left.get(offset, (None, None))
+        if offset == 0:
+            d, card_cells = None, [(values["card_name"], CARD_NAME_STYLE) for _, values in cards]
+        elif offset == 1:
+            d, card_cells = "Total", [(card, BOLD_STYLE) for card, _ in cards]
+        else:
+            key = AMOUNT_KEYS[offset - 2]
+            d, card_cells = totals[key], [(values[key], CELL_STYLE) for _, values in cards]
+        rows.append([(a, CELL_STYLE), (b, CELL_STYLE), (label, CELL_STYLE), (d, CELL_STYLE)] + card_cells)
+    return rows, totals
+
+
+def get_cell_value(cell):
+    # If value is None, try to get the formula string
+    if cell.data_type == 'f':
+        if cell.value is None:
+            return cell._value  # This is the formula string, e.g. '=SUM(...)'
+        return cell.value  # This is the cached value if available
+    return cell.value if cell.value is not None else 0
+
+
+def peek_value(ws: worksheet.Worksheet, row: int, column: int):
+    """Value of a cell without creating it, None if it was never written.
+
+    ws.cell() adds an empty cell, which grows max_row, and ws.max_row is itself a scan of
+    every cell. So openpyxl's cell store (the private ``_cells`` dict, keyed by (row,
+    column)) is read directly. If a release ever drops it, this falls back to a
+    bounds check before ws.cell(), which is slower but never grows the sheet.
+    """
+    cells = getattr(ws, "_cells", None)
+    if isinstance(cells, dict):
+        cell = cells.get((row, column))
+        return cell.value if cell is not None else None
+    if row > ws.max_row or column > ws.max_column:
+        return None
+    return ws.cell(row=row, column=column).value
+
+
+def record_summary(ws: worksheet.Worksheet, record_no: int) -> List:
+    """Statement date, balance due, minimum payment and payment due date as written in a record"""
+    row = record_row(record_no)
+    return [get_cell_value(ws.cell(row=row + 1, column=2)), get_cell_value(ws.cell(row=row + 6, column=4)),
+            get_cell_value(ws.cell(row=row + 7, column=4)), get_cell_value(ws.cell(row=row + 7, column=2))]
+
+
+def total_rows(ws_total: worksheet.Worksheet) -> Dict[str, int]:
+    """Row of every bank on the Total sheet"""
+    return {values[0]: row for row, values in enumerate(ws_total.iter_rows(min_row=2, max_col=1, values_only=True), start=2)
+            if values[0] is not None}
+
+
+def create_visible_sheet(wb: Workbook, title: str) -> worksheet.Worksheet:
+    """New sheet placed ahead of the hidden sheets, which always stay last"""
+    hidden = [wb.sheetnames.index(sheet) for sheet in HIDDEN_SHEETS if sheet in wb.sheetnames]
+    if hidden:
+        return wb.create_sheet(title, min(hidden))
+    return wb.create_sheet(title)
+
+
+def bank_sheet_names(wb: Workbook) -> List[str]:
+    return [sheet for sheet in wb.sheetnames if sheet != TOTAL_SHEET and sheet not in HIDDEN_SHEETS]
+
+
+def statement_fingerprint(bank_name: str, statement_date, cards: Iterable) -> Optional[str]:
+    """"UOB|2025-03-12|1234,5678": bank, statement date and the last 4 digits of every card.
+
+    Any copy of the same statement gives the same fingerprint, whichever PDF it came from.
+    None when the statement date is missing or unreadable: every undated statement of a
+    bank's cards would share one, so those are only matched by their PDF hash.
+    """
+    statement_on = iso_date(str(statement_date).strip()) if statement_date else None
+    if statement_on is None:
+        return None
+    return "|".join([bank_name, statement_on, ",".join(sorted(str(card)[-4:] for card in cards))])
+
+
+class RecordIndex:
+    """Latest record of every bank sheet, kept in a hidden sheet of the workbook.
+
+    One row per bank: record number, first row of that record, statement date, balance
+    due, minimum payment and payment due date. Lookups are O(1) instead of a scan down
+    column A. An entry is trusted only while its record cell holds the record number and
+    the next record slot is empty, otherwise (or when the sheet is missing, e.g. in
+    workbooks from older versions) it is rebuilt by scanning that bank sheet.
+    """
+
+    def __init__(self, wb: Workbook):
+        self.wb = wb
+        self.entries: Dict[str, Dict] = {}
+        self.rows: Dict[str, int] = {}
+        if INDEX_SHEET in wb.sheetnames:
+            self.ws = wb[INDEX_SHEET]
+            self._load()
+        else:
+            logger.info("RecordIndex: No index sheet found, building one")
+            self.ws = wb.create_sheet(INDEX_SHEET)
+            self.ws.sheet_state = "hidden"
+            self.ws.append(INDEX_HEADERS)
+
+    def _load(self) -> None:
+        for row, values in enumerate(self.ws.iter_rows(min_row=2, max_col=len(INDEX_HEADERS), values_only=True), start=2):
+            if values[0] is None:
+                continue
+            self.entries[values[0]] = dict(zip(INDEX_HEADERS, values))
+            self.rows[values[0]] = row
+
+    def _is_current(self, bank_name: str, entry: Dict) -> bool:
+        if bank_name not in self.wb.sheetnames:
+            return False
+        ws = self.wb[bank_name]
+        record_no, row = entry["Record No."], entry["Row"]
+        if not isinstance(record_no, int) or not isinstance(row, int):
+            return False
+        return peek_value(ws, row + 1, 1) == record_no and peek_value(ws, row + 1 + RECORD_ROWS, 1) is None
+
+    def get(self, bank_name: str) -> Optional[Dict]:
+        """Index entry of a bank sheet, rebuilt from the sheet if missing or stale"""
+        entry = self.entries.get(bank_name)
+        if entry is not None and self._is_current(bank_name, entry):
+            return entry
+        if bank_name not in self.wb.sheetnames:
+            return None
+        if entry is not None:
+            logger.warning("RecordIndex: Entry for %s is out of date, rescanning the sheet", bank_name)
+        return self.rebuild_entry(bank_name)
+
+    def rebuild_entry(self, bank_name: str) -> Dict:
+        ws = self.wb[bank_name]
+        record_no = ExcelManager.find_largest_record_no(ws)
+        return self.set(bank_name, record_no, *record_summary(ws, record_no))
+
+    def set(self, bank_name: str, record_no: int, statement_date, balance_due, minimum_payment, payment_date) -> Dict:
+        entry = dict(zip(INDEX_HEADERS, [bank_name, record_no, record_row(record_no), statement_date,
+                                         balance_due, minimum_payment, payment_date]))
+        row = self.rows.get(bank_name)
+        if row is None:
+            row = self.ws.max_row + 1
+            self.rows[bank_name] = row
+        for col, header in enumerate(INDEX_HEADERS, start=1):
+            self.ws.cell(row=row, column=col, value=entry[header])
+        self.entries[bank_name] = entry
+        return entry
+
+class IngestIndex:
+    """Fingerprint and PDF hash of every statement written to the workbook, kept in a hidden sheet.
+
+    One row per record: fingerprint (see statement_fingerprint) when the statement is dated,
+    SHA-256 of the PDF when known, bank, statement date and record number. Lookups are dict hits, so a statement
+    that is already in the workbook is caught before anything is written. Workbooks from
+    older versions get the sheet on first use, backfilled from the records on their bank
+    sheets (those rows have no PDF hash).
+    """
+
+    def __init__(self, wb: Workbook, index: Optional[RecordIndex] = None):
+        self.wb = wb
+        self.fingerprints: Dict[str, Tuple[str, int]] = {}
+        self.hashes: Dict[str, Tuple[str, int]] = {}
+        if INGESTED_SHEET in wb.sheetnames:
+            self.ws = wb[INGESTED_SHEET]
+            self._load()
+        else:
+            logger.info("IngestIndex: No ingested sheet found, building one from the bank sheets")
+            self.ws = wb.create_sheet(INGESTED_SHEET)
+            self.ws.sheet_state = "hidden"
+            self.ws.append(INGESTED_HEADERS)
+            self._backfill(index or RecordIndex(wb))
+
+    def _load(self) -> None:
+        for values in self.ws.iter_rows(min_row=2, max_col=len(INGESTED_HEADERS), values_only=True):
+            fingerprint, pdf_sha256, bank_name, _, record_no = values
+            if fingerprint:
+                self.fingerprints[fingerprint] = (bank_name, record_no)
+            if pdf_sha256:
+                self.hashes[pdf_sha256] = (bank_name, record_no)
+
+    def _backfill(self, index: RecordIndex) -> None:
+        for bank_name in bank_sheet_names(self.wb):
+            ws = self.wb[bank_name]
+            for record_no in range(1, (index.get(bank_name)["Record No."] or 0) + 1):
+                row = record_row(record_no) + 1
+                if peek_value(ws, row, 1) != record_no:
+                    continue
+                cards, col = [], 5
+                while peek_value(ws, row, col) is not None:
+                    cards.append(peek_value(ws, row, col))
+                    col += 1
+                self.add(bank_name, peek_value(ws, row, 2), cards, record_no)
+        logger.info("_backfill: Fingerprinted %s existing records", len(self.fingerprints))
+
+    def duplicate_of(self, bank_name: str, statement_date, cards: Iterable, pdf_sha256: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """(bank, record no) of the record this statement duplicates, None if it is new"""
+        if pdf_sha256 in self.hashes:
+            return self.hashes[pdf_sha256]
+        fingerprint = statement_fingerprint(bank_name, statement_date, cards)
+        return self.fingerprints.get(fingerprint) if fingerprint else None
+
+    def replace_bank(self, bank_name: str, records: Iterable[Tuple]) -> None:
+        """Swap every row of one bank for (statement_date, cards, record_no, pdf_sha256) records, after its sheet was rebuilt"""
+        kept = [values for values in self.ws.iter_rows(min_row=2, max_col=len(INGESTED_HEADERS), values_only=True)
+                if (values[0] or values[1]) and values[2] != bank_name]
+        self.ws.delete_rows(2, self.ws.max_row)
+        self.fingerprints, self.hashes = {}, {}
+        for values in kept:
+            self.ws.append(list(values))
+        self._load()
+        for statement_date, cards, record_no, pdf_sha256 in records:
+            self.add(bank_name, statement_date, cards, record_no, pdf_sha256)
+
+    def add(self, bank_name: str, statement_date, cards: Iterable, record_no: int, pdf_sha256: Optional[str] = None) -> Optional[str]:
+        fingerprint = statement_fingerprint(bank_name, statement_date, cards)
+        if fingerprint is None and not pdf_sha256:
+            return None  # nothing to match a later copy against
+        self.ws.append([fingerprint, pdf_sha256, bank_name, statement_date, record_no])
+        if fingerprint:
+            self.fingerprints[fingerprint] = (bank_name, record_no)
+        if pdf_sha256:
+            self.hashes[pdf_sha256] = (bank_name, record_no)
+        return fingerprint
+
+
 class ExcelManager():
-    def __init__(self, bank_name:str, date:Dict[str,str], results:Dict[str, Dict[str,float]]):
+    def __init__(self, bank_name:str, date:Dict[str,str], results:Dict[str, Dict[str,float]], pdf_sha256: Optional[str] = None):
         self.bank_name = bank_name
         self.date = date
         self.results = results      
-        logger.info(f"excel_operations_init: ExcelManager initialized for {self.bank_name}. date and results obtained")
+        self.pdf_sha256 = pdf_sha256
+        logger.info("excel_operations_init: ExcelManager initialized for %s. date and results obtained", self.bank_name)
         
 
-    def set_alignment(self, ws:worksheet, record_no:int, result: Dict[str, Dict[str, float]] ):
-        try:
-            logger.info(f"set_alignment: Setting alignment for excel")
-            for row in range(2+(record_no-1)*9, 10+(record_no-1)*9):
-                for col in range(1, 5+len(result) ):
-                    cell = ws.cell(row = row, column = col)
-                    cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            logger.info(f"set_alignment: Alignment set successfully")
-        except Exception as e:
-            logger.error(f"set_alignment: Failed to set alignment: {e}")
-
-    def insert_header(self, ws:worksheet, record_no:int, data: Dict[str, str]):
-        logger.info(f"insert_header: Writing header to excel")
-        list = ["Card Name","Card No.", "Previous Balance", "Credit Payment", "Debit Fees", "Retail Purchases", "Balance Due", "Minimum Payment"]
-        ws[f"A{2 + (record_no -1)*9}"] = "Record No."
-        ws[f"A{3 + (record_no -1)*9}"] = data["record_number"]
-        ws[f"D{3 + (record_no -1)*9}"] = "Total"
-        ws[f"B{2 + (record_no -1)*9}"] = "Statement Date"
-        ws[f"B{3 + (record_no -1)*9}"] = data["statement_date"]
-        ws[f"B{8 + (record_no -1)*9}"] = "Payment Due Date"
-        ws[f"B{9 + (record_no -1)*9}"] = data["payment_date"]
-        ws.column_dimensions["A"].width = 10
-        ws.column_dimensions["B"].width = 17
-        ws.column_dimensions["C"].width = 17
-        ws.column_dimensions["D"].width = 12
-        for i, header in enumerate(list, start = 1):
-            i += 1+(record_no-1)*9
-            ws[f"C{i}"] = header
-        logger.info(f"insert_header: Headers written successfully")
-
-    def insert_key_value(self, ws:worksheet, record_no:int, result: Dict[str, Dict[str,float]]):
-        logger.info(f"insert_key_value: Writing key value to excel")
-        total_dict = {
-            "previous_balance": 0,
-            "credit_payment": 0,
-            "debit_fees": 0,
-            "retail_purchase": 0,
-            "balance_due": 0,
-            "minimum_payment": 0
-        }
-        for i, (card, values) in enumerate(result.items(), start = 1):
-                i += 4
-                ws.cell(row= 2+(record_no-1)*9, column = i, value = values["card_name"]),
-                ws.cell(row= 2+(record_no-1)*9, column = i).font = Font(size = 9.5, bold = True)
-                ws.cell(row= 3+(record_no-1)*9, column = i, value = card)
-                ws.cell(row= 3+(record_no-1)*9, column = i).font = Font(bold = True)
-                ws.cell(row= 4+(record_no-1)*9, column = i, value = values["previous_balance"]),
-                ws.cell(row= 5+(record_no-1)*9, column = i, value = values["credit_payment"]),
-                ws.cell(row= 6+(record_no-1)*9, column = i, value = values["debit_fees"]),
-                ws.cell(row= 7+(record_no-1)*9, column = i, value = values["retail_purchase"]),    
-                ws.cell(row= 8+(record_no-1)*9, column = i, value = values["balance_due"]),
-                ws.cell(row= 9+(record_no-1)*9, column = i, value = values["minimum_payment"]),
-                logger.info(f"insert_key_value: Writing values of {card} to excel")
-                total_dict["previous_balance"] += values["previous_balance"]
-                total_dict["credit_payment"] += values["credit_payment"]
-                total_dict["debit_fees"] += values["debit_fees"]
-                total_dict["retail_purchase"] += values["retail_purchase"]
-                total_dict["balance_due"] += values["balance_due"]
-                total_dict["minimum_payment"] += values["minimum_payment"]
-                logger.info(f"insert_key_value: Adding amount to total dict")
-                ws.column_dimensions[get_column_letter(i)].width = 20
-        ws.row_dimensions[2+(record_no-1)*9].height = 26
-        logger.info(f"insert_key_value: Finished writing key value to excel")
-        logger.info(f"insert_key_value: Writing total values to excel")   
-        ws.cell(row= 4+(record_no-1)*9, column = 4, value = total_dict["previous_balance"]),
-        ws.cell(row= 5+(record_no-1)*9, column = 4, value = total_dict["credit_payment"]),
-        ws.cell(row= 6+(record_no-1)*9, column = 4, value = total_dict["debit_fees"]),
-        ws.cell(row= 7+(record_no-1)*9, column = 4, value = total_dict["retail_purchase"]),    
-        ws.cell(row= 8+(record_no-1)*9, column = 4, value = total_dict["balance_due"]),
-        ws.cell(row= 9+(record_no-1)*9, column = 4, value = total_dict["minimum_payment"]),
-        logger.info(f"insert_key_value: Finished writing total values to excel")
-        
+    def write_record(self, ws: worksheet, record_no: int, data: Dict[str, str]) -> Dict[str, float]:
+        """Write a whole record block in one pass, every cell with its value and named style"""
+        logger.info("write_record: Writing record %s to excel", record_no)
+        register_styles(ws.parent)
+        result = data[f"results{record_no}"]
+        rows, totals = record_block(record_no, data, result)
+        first_row = record_row(record_no)
+        for row, cells in enumerate(rows, start = first_row):
+            for col, (value, style) in enumerate(cells, start = 1):
+                ws.cell(row = row, column = col, value = value).style = style
+        for column, width in (("A", 10), ("B", 17), ("C", 17), ("D", 12)):
+            ws.column_dimensions[column].width = width
+        for col in range(5, 5 + len(result)):
+            ws.column_dimensions[get_column_letter(col)].width = 20
+        ws.row_dimensions[first_row].height = 26
+        logger.info("write_record: Record %s written successfully", record_no)
+        return totals
 
     def create_excel_file(self,save_path = None):
-        logger.info(f"create_excel_file: Creating new Excel file")
-
-        data = {
-            "record_number" : 1,
-            "statement_date" : self.date["statement_date"],
-            "payment_date" : self.date["payment_date"],
-            "bank_name" : self.bank_name,
-            "results1" : self.results
-        }
+        logger.info("create_excel_file: Creating new Excel file")
 
         try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = self.bank_name
-            logger.info(f"create_excel_file: Worksheet {self.bank_name} created")
-
-            self.insert_everything(ws, 1, data)
-            
             if not save_path:
                 logger.error("create_excel_file: No save_path provided for create_excel_file in GUI mode.")
                 raise ValueError("create_excel_file: No save_path provided for create_excel_file in GUI mode.")
-            wb.save(save_path)
 
-            logger.info(f"create_excel_file: Saving excel file")
+            # Bank sheet and Total are written in memory and saved once
+            with WorkbookSession(save_path, create = True) as wb:
+                self.insert_record(wb)
+                logger.info("create_excel_file: Worksheet %s created", self.bank_name)
+                self.write_total_sheet(wb)
 
-            self.create_update_total_sheet(save_path)
-
-            
-
-            logger.info(f"create_excel_file: Excel file saved at: {save_path}")
+            logger.info("create_excel_file: Excel file saved at: %s", save_path)
 
         except Exception as e:
-            logger.error(f"create_excel_file: Failed to create Excel file: {e}")
+            logger.error("create_excel_file: Failed to create Excel file: %s", e)
             raise RuntimeError(f"create_excel_file: Failed to create Excel file: {str(e)}")
 
-    
-
     def update_excel(self, excel_path:str):
-        logger.info(f"update_excel: Updating existing Excel file at {excel_path}")
+        logger.info("update_excel: Updating existing Excel file at %s", excel_path)
         try:
-            wb = load_workbook(excel_path)
-            logger.info(f"update_excel: Available worksheets: {wb.sheetnames}")
+            with WorkbookSession(excel_path) as wb:
+                logger.info("update_excel: Available worksheets: %s", wb.sheetnames)
+                status = self.insert_record(wb)
+                self.refresh_total_sheet(wb, [self.bank_name])
 
-            if self.bank_name in wb.sheetnames:
-                ws = wb[self.bank_name]
-                record_no = self.find_largest_record_no(ws) +1
-                data = {
-                        "record_number" : record_no,
-                        "statement_date" : self.date["statement_date"],
-                        "payment_date" : self.date["payment_date"],
-                        "bank_name" : self.bank_name,
-                        f"results{record_no}" : self.results
-                    }
-                logger.info(f"update_excel: Sheet '{self.bank_name}' found in the workbook.")
-
-                self.insert_everything(ws, record_no, data)
-                wb.save(excel_path)
-                logger.info(f"update_excel: Saving excel file")
-
-                self.create_update_total_sheet(excel_path)
-
-                
-                logger.info(f"update_excel: Excel file saved and updated successdully")
-                return "updated"
-            else:
-                logger.info("update_excel: No bank sheet detected in available sheets, creating new one")
-                ws = wb.create_sheet(self.bank_name)
-
-                data = {
-                        "record_number" : 1,
-                        "statement_date" : self.date["statement_date"],
-                        "payment_date" : self.date["payment_date"],
-                        "bank_name" : self.bank_name,
-                        f"results1" : self.results
-                    }
-
-                logger.info(f"update_excel: New sheet '{self.bank_name}' created.")
-                self.insert_everything(ws, 1, data)
-                
-                wb.save(excel_path)
-                logger.info(f"update_excel: Saving excel file")
-
-                self.create_update_total_sheet(excel_path)
+            logger.info("update_excel: Excel file saved and %s successfully", status)
+            return status
+        except Exception as e:
+            logger.error("update_excel: Failed to update Excel file: %s", e)
+            raise RuntimeError(f"update_excel: Failed to update Excel file: {str(e)}")
 
-                
+    @classmethod
+    def apply_statements(cls, excel_path: str, statements: Iterable[Tuple]) -> Dict[str, str]:
+        """Write (bank_name, date, results[, pdf_sha256]) statements of any banks with one load and one save.
 
-                logger.info(f"update_excel: New sheet created and saved successfully.")
-                return "inserted"
+        Creates the workbook if it does not exist yet. Total is rebuilt once at the end.
+        Returns "inserted" or "updated" per bank, as update_excel does for one statement,
+        or "duplicate" for a bank whose statements were all in the workbook already.
+        """
+        logger.info("apply_statements: Applying statements to %s", excel_path)
+        try:
+            with WorkbookSession(excel_path, create = not os.path.exists(excel_path)) as wb:
+                status = cls.insert_records(wb, statements)
+                written = [bank_name for bank_name, state in status.items() if state != "duplicate"]
+                if written:
+                    cls.refresh_total_sheet(wb, written)
+            logger.info("apply_statements: Excel file saved, %s", status)
+            return status
         except Exception as e:
-            logger.error(f"update_excel: Failed to update Excel file: {e}")
-            raise RuntimeError(f"update_excel: Failed to update Excel file: {str(e)}")
+            logger.error("apply_statements: Failed to update Excel file: %s", e)
+            raise RuntimeError(f"apply_statements: Failed to update Excel file: {str(e)}")
+
+    @classmethod
+    def insert_records(cls, wb: Workbook, statements: Iterable[Tuple]) -> Dict[str, str]:
+        """Write many statements as records of their bank sheets in an open workbook.
+
+        Statements are (bank_name, date, results) with an optional PDF SHA-256 fourth.
+        Any that is already in the workbook, or earlier in the same batch, is skipped.
+        Statements are grouped by bank in the order given, so every sheet's next record
+        number is looked up and its index entry written once per batch.
+        """
+        index = RecordIndex(wb)
+        ingested = IngestIndex(wb, index)
+        grouped: Dict[str, List[Tuple[Dict[str, str], Dict[str, Dict[str, float]], Optional[str]]]] = {}
+        status = {}
+        seen = set()
+        for bank_name, date, results, *rest in statements:
+            pdf_sha256 = rest[0] if rest else None
+            keys = {statement_fingerprint(bank_name, date["statement_date"], results), pdf_sha256} - {None}
+            duplicate = ingested.duplicate_of(bank_name, date["statement_date"], results, pdf_sha256)
+            if duplicate is not None or keys & seen:
+                logger.warning("insert_records: Skipping %s statement of %s, already recorded as %s",
+                               bank_name, date["statement_date"], duplicate or "an earlier statement of this batch")
+                status.setdefault(bank_name, "duplicate")
+                continue
+            seen |= keys
+            grouped.setdefault(bank_name, []).append((date, results, pdf_sha256))
+
+        for bank_name, records in grouped.items():
+            if bank_name in wb.sheetnames:
+                ws = wb[bank_name]
+                record_no = index.get(bank_name)["Record No."]
+                status[bank_name] = "updated"
+            else:
+                logger.info("insert_records: Creating sheet %s", bank_name)
+                ws = create_visible_sheet(wb, bank_name)
+                record_no = 0
+                status[bank_name] = "inserted"
+            for date, results, pdf_sha256 in records:
+                record_no += 1
+                manager = cls(bank_name, date, results)
+                data = {"statement_date": date["statement_date"], "payment_date": date["payment_date"], f"results{record_no}": results}
+                totals = manager.write_record(ws, record_no, data)
+                ingested.add(bank_name, date["statement_date"], results, record_no, pdf_sha256)
+            manager.update_index(index, record_no, totals)
+            logger.info("insert_records: Wrote %s records to %s", len(records), bank_name)
+        return status
+
+    def insert_record(self, wb: Workbook) -> str:
+        """Write this statement as the next record of its bank sheet in an open workbook.
+
+        Returns "updated" when the bank sheet already existed and "inserted" when it was created.
+        Raises "DUPLICATE STATEMENT" without writing anything if the statement is already in the workbook.
+        """
+        index = RecordIndex(wb)
+        ingested = IngestIndex(wb, index)
+        duplicate = ingested.duplicate_of(self.bank_name, self.date["statement_date"], self.results, self.pdf_sha256)
+        if duplicate is not None:
+            logger.warning("insert_record: %s statement of %s is already record %s of sheet %s",
+                           self.bank_name, self.date["statement_date"], duplicate[1], duplicate[0])
+            raise RuntimeError(f"DUPLICATE STATEMENT: This {self.bank_name} statement of {self.date['statement_date']} "
+                               f"is already record {duplicate[1]} of sheet {duplicate[0]}")
+        if self.bank_name in wb.sheetnames:
+            ws = wb[self.bank_name]
+            record_no = index.get(self.bank_name)["Record No."] +1
+            data = {
+                    "record_number" : record_no,
+                    "statement_date" : self.date["statement_date"],
+                    "payment_date" : self.date["payment_date"],
+                    "bank_name" : self.bank_name,
+                    f"results{record_no}" : self.results
+                }
+            logger.info("insert_record: Sheet '%s' found in the workbook.", self.bank_name)
+
+            totals = self.insert_everything(ws, record_no, data)
+            self.update_index(index, record_no, totals)
+            ingested.add(self.bank_name, self.date["statement_date"], self.results, record_no, self.pdf_sha256)
+            return "updated"
+        else:
+            logger.info("insert_record: No bank sheet detected in available sheets, creating new one")
+            ws = create_visible_sheet(wb, self.bank_name)
+
+            data = {
+                    "record_number" : 1,
+                    "statement_date" : self.date["statement_date"],
+                    "payment_date" : self.date["payment_date"],
+                    "bank_name" : self.bank_name,
+                    f"results1" : self.results
+                }
+
+            logger.info("insert_record: New sheet '%s' created.", self.bank_name)
+            totals = self.insert_everything(ws, 1, data)
+            self.update_index(index, 1, totals)
+            ingested.add(self.bank_name, self.date["statement_date"], self.results, 1, self.pdf_sha256)
+            return "inserted"
+
+    def update_index(self, index: RecordIndex, record_no: int, totals: Dict[str, float]) -> None:
+        index.set(self.bank_name, record_no, self.date["statement_date"], totals["balance_due"],
+                  totals["minimum_payment"], self.date["payment_date"])
 
     def insert_everything(self, ws: worksheet, record_no:int, data: Dict[str,str]):
         
         try:
             logger.info("insert_everything: Writing everythin to excel")
-            self.insert_header(ws, record_no, data)
-
-            result = data[f"results{record_no}"]
-            self.insert_key_value(ws, record_no, result)
-
-            self.set_alignment(ws, record_no, result)
-            
-            logger.info(f"insert_everything: Finished writing everything to excel.")
+            totals = self.write_record(ws, record_no, data)
+            logger.info("insert_everything: Finished writing everything to excel.")
+            return totals
         except Exception as e:
-            logger.error(f"insert_everything: Failed to insert info: {e}")
+            logger.error("insert_everything: Failed to insert info: %s", e)
             raise RuntimeError(f"insert_everything: Failed to create Excel file: {str(e)}")
 
-    def find_largest_record_no(self, ws:worksheet):
+    @staticmethod
+    def find_largest_record_no(ws:worksheet):
+        """Scan column A for the latest record number, RecordIndex falls back to this"""
         try:
-            logger.info(f"find_largest_record_no: Finding most recent record number")
-            logger.info(f"find_largest_record_no: Loading sheet {ws.title}")
+            logger.info("find_largest_record_no: Finding most recent record number")
+            logger.info("find_largest_record_no: Loading sheet %s", ws.title)
             max_record = None
             empty_count = 0
             for row in range(3, ws.max_row+1):
@@ -219,78 +480,181 @@ class ExcelManager():
                         max_record = record_no
                 except (TypeError, ValueError):
                     continue
-            logger.info(f"find_largest_record_no: Found recent record number: {max_record} for {ws.title}")
+            logger.info("find_largest_record_no: Found recent record number: %s for %s", max_record, ws.title)
             return max_record if max_record is not None else 1
         except Exception as e:
-            logger.error(f"find_largest_record_no: Failed to find morst recent record no")
+            logger.error("find_largest_record_no: Failed to find morst recent record no")
             raise RuntimeError(f"find_largest_record_no: Failed to find most recent record no: {str(e)}")
 
     def create_update_total_sheet(self, excel_path:str):
-        wb = load_workbook(excel_path)
-        logger.info(f"create_update_total_sheet: Loading workbook")
+        logger.info("create_update_total_sheet: Loading workbook")
+        with WorkbookSession(excel_path) as wb:
+            self.write_total_sheet(wb)
+
+    @classmethod
+    def write_total_sheet(cls, wb: Workbook):
         try:
-            if "Total" not in wb.sheetnames:
-                logger.info(f"create_update_total_sheet: Total sheet not found, creating total sheet")
-                ws_total = wb.create_sheet("Total")
-            else:
-                ws_total = wb["Total"]
-                logger.info(f"create_update_total_sheet: Total sheet detected, loading it")
-            headers = ["Bank", "Balance Due", "Minimum Payment", "Payment Due Date"]
-            for i, header in enumerate(headers, start = 1):
-                ws_total.cell(row = 1, column = i, value = header)
-                ws_total.cell(row = 1, column = i ).font = Font(bold = True)
-            ws_total.column_dimensions["A"].width = 17
-            ws_total.column_dimensions["B"].width = 15
-            ws_total.column_dimensions["C"].width = 15
-            ws_total.column_dimensions["D"].width = 20
-            logger.info(f"create_update_total_sheet: Loading all sheets except total")
-            sheets = [sheet for sheet in wb.sheetnames if sheet != "Total"]
-            logger.info(f"create_update_total_sheet: Available sheets: {sheets}")
+            logger.info("write_total_sheet: Loading all sheets except total")
+            sheets = bank_sheet_names(wb)
+            logger.info("write_total_sheet: Available sheets: %s", sheets)
+            index = RecordIndex(wb)
             data = {}
             for sheet in sheets:
-                ws = wb[sheet]
-                
-                record_no = self.find_largest_record_no(ws)
-                logger.info(f"create_update_total_sheet: Getting data for {sheet}")
-                data[sheet] = {}
-                cell1 = ws[f'd{8+(record_no-1)*9}']
-                cell2 = ws[f'd{9+(record_no-1)*9}']
-                cell3 = ws[f'B{9+(record_no-1)*9}']
-                logger.info(f"Checking all cell values whether is formula/none/integer")
-                def get_cell_value(cell):
-                    # If value is None, try to get the formula string
-                    if cell.data_type == 'f':
-                        if cell.value is None:
-                            return cell._value  # This is the formula string, e.g. '=SUM(...)'
-                        return cell.value  # This is the cached value if available
-                    return cell.value if cell.value is not None else 0
-
-                data[sheet]["Balance Due"] = get_cell_value(cell1)
-                logger.info(f"create_update_total_sheet: Balance Due: {data[sheet]['Balance Due']}")
-                data[sheet]["Minimum Payment"] = get_cell_value(cell2)
-                logger.info(f"create_update_total_sheet: Minimum Payment: {data[sheet]['Minimum Payment']}")
-                data[sheet]["Payment Due Date"] = get_cell_value(cell3)
-                logger.info(f"create_update_total_sheet: Payment Due Date: {data[sheet]['Payment Due Date']}")
+                # Latest record values come from the index instead of a scan of every sheet
+                entry = index.get(sheet)
+                data[sheet] = {key: entry[key] for key in TOTAL_FIELDS}
+                logger.info("write_total_sheet: %s: %s", sheet, data[sheet])
             
-            logger.info(f"create_update_total_sheet: Finished getting data from all sheets\n{data}\now writing to total sheet")
-            for row, (sheet, values) in enumerate(data.items(), start = 2):
-                ws_total.cell(row = row, column = 1, value = sheet)
-                ws_total.cell(row = row, column = 1).font = Font(bold = True)
-                ws_total.cell(row = row, column = 2, value = values["Balance Due"])
-                ws_total.cell(row = row, column = 3, value = values["Minimum Payment"])
-                ws_total.cell(row = row, column = 4, value = values["Payment Due Date"])
-                logger.info(f"create_update_total_sheet: Finished writing data of {sheet} to total sheet")
-            logger.info("create_update_total_sheet: Finished writing all data to total sheet")
-            logger.info("create_update_total_sheet: Setting alignment for total sheet")
-            for row in range(1,len(data)+2):
-                for col in range(1, 5):
-                    ws_total.cell(row= row, column = col).alignment = Alignment(horizontal = "center", vertical = "center", wrap_text = True)
-            logger.info("create_update_total_sheet: Finished setting alignment for total sheet")
-            logger.info("create_update_total_sheet: Finished creating/updating total sheet")
-            wb.save(excel_path)
+            logger.info("write_total_sheet: Finished getting data from all sheets\n%s\now writing to total sheet", data)
+            cls.fill_total_sheet(wb, data)
+            logger.info("write_total_sheet: Finished creating/updating total sheet")
+        except Exception as e:
+            logger.error("write_total_sheet: Error: %s", e)
+            raise RuntimeError(f"write_total_sheet: Error: {str(e)}")
+
+    @classmethod
+    def fill_total_sheet(cls, wb: Workbook, data: Dict[str, Dict]) -> None:
+        """Write one Total row per bank from its Balance Due, Minimum Payment and Payment Due Date"""
+        if TOTAL_SHEET not in wb.sheetnames:
+            logger.info("fill_total_sheet: Total sheet not found, creating total sheet")
+            ws_total = create_visible_sheet(wb, TOTAL_SHEET)
+        else:
+            ws_total = wb[TOTAL_SHEET]
+            logger.info("fill_total_sheet: Total sheet detected, loading it")
+        register_styles(wb)
+        for i, header in enumerate(TOTAL_HEADERS, start = 1):
+            ws_total.cell(row = 1, column = i, value = header).style = BOLD_STYLE
+        ws_total.column_dimensions["A"].width = 17
+        ws_total.column_dimensions["B"].width = 15
+        ws_total.column_dimensions["C"].width = 15
+        ws_total.column_dimensions["D"].width = 20
+        for row, (sheet, values) in enumerate(data.items(), start = 2):
+            cls.write_total_row(ws_total, row, sheet, values)
+            logger.info("fill_total_sheet: Finished writing data of %s to total sheet", sheet)
+        if ws_total.max_row > len(data) + 1:
+            # Rows of banks whose sheet is gone
+            ws_total.delete_rows(len(data) + 2, ws_total.max_row - len(data) - 1)
+        logger.info("fill_total_sheet: Finished writing all data to total sheet")
+
+    @staticmethod
+    def write_total_row(ws_total: worksheet.Worksheet, row: int, bank_name: str, values: Dict) -> None:
+        ws_total.cell(row = row, column = 1, value = bank_name).style = BOLD_STYLE
+        for col, key in enumerate(TOTAL_FIELDS, start = 2):
+            ws_total.cell(row = row, column = col, value = values[key]).style = CELL_STYLE
+
+    @classmethod
+    def refresh_total_sheet(cls, wb: Workbook, banks: List[str], verify: bool = True) -> str:
+        """Rewrite only the Total rows of ``banks`` and leave the others alone.
+
+        Falls back to a full write_total_sheet when the Total sheet is missing or malformed,
+        or when ``verify`` finds it out of step with the bank sheets afterwards: rows of
+        every bank in sheet order, and the rewritten rows equal to their latest record.
+        Returns "incremental" or "rebuilt".
+        """
+        try:
+            index = RecordIndex(wb)
+            if all(cls.update_total_row(wb, bank_name, index) for bank_name in banks):
+                problems = cls.check_total_sheet(wb, banks, index) if verify else []
+                if not problems:
+                    logger.info("refresh_total_sheet: Updated Total rows of %s", banks)
+                    return "incremental"
+                logger.warning("refresh_total_sheet: Total sheet does not match the bank sheets, rebuilding it: %s", problems)
+            cls.write_total_sheet(wb)
+            return "rebuilt"
+        except Exception as e:
+            logger.error("refresh_total_sheet: Error: %s", e)
+            raise RuntimeError(f"refresh_total_sheet: Error: {str(e)}")
+
+    @classmethod
+    def update_total_row(cls, wb: Workbook, bank_name: str, index: Optional[RecordIndex] = None) -> bool:
+        """Rewrite one bank's Total row from the record index, False when Total needs a full rebuild"""
+        if TOTAL_SHEET not in wb.sheetnames:
+            logger.info("update_total_row: No Total sheet yet")
+            return False
+        ws_total = wb[TOTAL_SHEET]
+        if [peek_value(ws_total, 1, col) for col in range(1, len(TOTAL_HEADERS) + 1)] != TOTAL_HEADERS:
+            logger.info("update_total_row: Total sheet headers do not match")
+            return False
+        entry = (index or RecordIndex(wb)).get(bank_name)
+        if entry is None:
+            return False
+        rows = total_rows(ws_total)
+        # A bank new to the workbook gets the row after the last one, as a full rebuild would
+        row = rows.get(bank_name, max(rows.values(), default = 1) + 1)
+        register_styles(wb)
+        cls.write_total_row(ws_total, row, bank_name, entry)
+        return True
+
+    @staticmethod
+    def check_total_sheet(wb: Workbook, banks: Optional[List[str]] = None, index: Optional[RecordIndex] = None) -> List[str]:
+        """Differences between the Total sheet and the bank sheets, empty when they agree.
+
+        Every bank sheet needs its Total row, in sheet order. Values are compared with the
+        latest record for ``banks`` only, default every bank.
+        """
+        if TOTAL_SHEET not in wb.sheetnames:
+            return ["Total sheet is missing"]
+        ws_total = wb[TOTAL_SHEET]
+        rows = total_rows(ws_total)
+        sheets = bank_sheet_names(wb)
+        index = index or RecordIndex(wb)
+        problems = []
+        for position, sheet in enumerate(sheets, start = 2):
+            row = rows.get(sheet)
+            if row is None:
+                problems.append(f"{sheet}: no Total row")
+                continue
+            if row != position:
+                problems.append(f"{sheet}: Total row {row} instead of {position}")
+            if banks is not None and sheet not in banks:
+                continue
+            # Compared with the record cells themselves, not just the index
+            expected = record_summary(wb[sheet], index.get(sheet)["Record No."])[1:]
+            actual = [peek_value(ws_total, row, col) for col in range(2, 2 + len(TOTAL_FIELDS))]
+            actual = [0 if value is None else value for value in actual]
+            if actual != expected:
+                problems.append(f"{sheet}: Total row has {actual}, latest record has {expected}")
+        problems += [f"{sheet}: Total row without a bank sheet" for sheet in rows if sheet not in sheets]
+        return problems
+
+    def render_bank_sheet(self, wb: Workbook, ledger: Ledger) -> int:
+        """Rebuild this bank's sheet from every statement of the bank in the ledger, returns the record count"""
+        try:
+            if self.bank_name in wb.sheetnames:
+                position = wb.sheetnames.index(self.bank_name)
+                wb.remove(wb[self.bank_name])
+                ws = wb.create_sheet(self.bank_name, position)
+            else:
+                ws = create_visible_sheet(wb, self.bank_name)
+            index = RecordIndex(wb)
+            record_no = 0
+            ingested = []
+            for record_no, (pdf_sha256, _, _, date, results) in enumerate(ledger.archive(self.bank_name), start = 1):
+                data = {"statement_date": date["statement_date"], "payment_date": date["payment_date"], f"results{record_no}": results}
+                totals = self.write_record(ws, record_no, data)
+                ingested.append((date["statement_date"], list(results), record_no, pdf_sha256))
+            if record_no:
+                index.set(self.bank_name, record_no, date["statement_date"], totals["balance_due"],
+                          totals["minimum_payment"], date["payment_date"])
+            # The sheet's records are now the ledger's, so are its fingerprints
+            IngestIndex(wb, index).replace_bank(self.bank_name, ingested)
+            logger.info("render_bank_sheet: Rendered %s records of %s from the ledger", record_no, self.bank_name)
+            return record_no
+        except Exception as e:
+            logger.error("render_bank_sheet: Error: %s", e)
+            raise RuntimeError(f"render_bank_sheet: Error: {str(e)}")
+
+    def render_total_sheet(self, wb: Workbook, ledger: Ledger) -> None:
+        """Rebuild the Total sheet from the latest statement of every bank in the ledger.
+
+        Only for workbooks generated entirely from the ledger, any other bank sheet would
+        lose its Total row. Existing workbooks use write_total_sheet after rendering.
+        """
+        try:
+            self.fill_total_sheet(wb, ledger.latest_totals())
         except Exception as e:
-            logger.error(f"create_update_total_sheet: Error: {e}")
-            raise RuntimeError(f"create_update_total_sheet: Error: {str(e)}")
+            logger.error("render_total_sheet: Error: %s", e)
+            raise RuntimeError(f"render_total_sheet: Error: {str(e)}")
             
 
 
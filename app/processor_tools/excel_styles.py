@@ -0,0 +1,32 @@
+from copy import copy
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+# Style objects are shared by every cell instead of being built per cell
+CENTER = Alignment(horizontal="center", vertical="center", wrap_text=True)
+BOLD = Font(bold=True)
+CARD_NAME_FONT = Font(size=9.5, bold=True)
+
+# Named styles of record and Total sheet cells, all centred
+CELL_STYLE = "Tracker Cell"
+BOLD_STYLE = "Tracker Bold"
+CARD_NAME_STYLE = "Tracker Card Name"
+STYLE_FONTS = {
+    CELL_STYLE: DEFAULT_FONT,
+    BOLD_STYLE: BOLD,
+    CARD_NAME_STYLE: CARD_NAME_FONT,
+}
+
+
+def register_styles(wb: Workbook) -> None:
+    """Add the named styles to a workbook that does not have them yet.
+
+    A cell given a style by name copies the style's ids, instead of openpyxl hashing and
+    looking up a fresh Font/Alignment for every cell. Each workbook gets its own
+    NamedStyle objects, as they hold ids into that workbook's style tables.
+    """
+    names = wb.named_styles
+    for name, font in STYLE_FONTS.items():
+        if name not in names:
+            wb.add_named_style(NamedStyle(name=name, font=copy(font), alignment=copy(CENTER)))
@@ -0,0 +1,194 @@
+import datetime
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from credit_card_tracker.app.banks.statement_record import AMOUNT_KEYS, StatementRecord, to_cents
+from credit_card_tracker.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Formats the banks' date_pattern can match
+DATE_FORMATS = ["%d %b %Y", "%d %b %y", "%d/%m/%Y", "%d/%m/%y", "%Y-%m-%d", "%d-%m-%Y", "%d-%m-%y"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY,
+    bank TEXT NOT NULL,
+    statement_date TEXT,
+    payment_date TEXT,
+    statement_on TEXT,
+    payment_on TEXT,
+    pdf_sha256 TEXT UNIQUE,
+    source TEXT,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS statements_bank ON statements (bank, id);
+CREATE INDEX IF NOT EXISTS statements_statement_on ON statements (statement_on);
+
+CREATE TABLE IF NOT EXISTS cards (
+    id INTEGER PRIMARY KEY,
+    bank TEXT NOT NULL,
+    card_no TEXT NOT NULL,
+    card_name TEXT,
+    UNIQUE (bank, card_no)
+);
+
+CREATE TABLE IF NOT EXISTS card_summaries (
+    statement_id INTEGER NOT NULL REFERENCES statements (id) ON DELETE CASCADE,
+    card_id INTEGER NOT NULL REFERENCES cards (id),
+    position INTEGER NOT NULL,
+    card_name TEXT,
+    {", ".join(f"{field} INTEGER NOT NULL" for field in AMOUNT_KEYS)},
+    PRIMARY KEY (statement_id, card_id)
+);
+CREATE INDEX IF NOT EXISTS card_summaries_card ON card_summaries (card_id, statement_id);
+"""
+
+
+def from_cents(cents: Optional[int]) -> float:
+    return (cents or 0) / 100
+
+
+def iso_date(text: Optional[str]) -> Optional[str]:
+    """"12 MAR 2025" -> "2025-03-12", None when the text is not a date"""
+    if not text:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text.strip(), fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+class Ledger:
+    """Local SQLite store of every parsed statement, the system of record behind the workbook.
+
+    One row per statement (bank, dates as printed and as ISO dates, PDF SHA-256), one per
+    card and one summary per card per statement with the amounts of base_data() in cents.
+    Recording a PDF that is already in the ledger replaces its rows instead of adding a
+    second statement. Bank sheets and the Total sheet are rendered from indexed queries,
+    see ExcelManager.render_bank_sheet and render_total_sheet.
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), "Documents", "Credit Card Tracker", "ledger.sqlite3")
+
+    def __init__(self, path: str = None):
+        self.path = path or self.DEFAULT_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute("PRAGMA foreign_keys = ON")
+            self.conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            logger.error("Ledger: Failed to open ledger %s: %s", self.path, e)
+            raise RuntimeError(f"LEDGER ERROR: Failed to open ledger {self.path}: {str(e)}")
+        logger.info("Ledger: Opened ledger %s", self.path)
+
+    def _insert(self, bank_name: str, dates: Dict[str, str], results: Dict[str, Dict[str, float]],
+                pdf_sha256: Optional[str], source: Optional[str]) -> int:
+        statement = (bank_name, dates.get("statement_date"), dates.get("payment_date"), iso_date(dates.get("statement_date")),
+                     iso_date(dates.get("payment_date")), source, datetime.datetime.now().isoformat(timespec="seconds"))
+        row = self.conn.execute("SELECT id FROM statements WHERE pdf_sha256 = ?", (pdf_sha256,)).fetchone() if pdf_sha256 else None
+        if row:
+            statement_id = row[0]
+            logger.info("_insert: %s is already statement %s, replacing it", pdf_sha256[:12], statement_id)
+            self.conn.execute("UPDATE statements SET bank = ?, statement_date = ?, payment_date = ?, statement_on = ?, "
+                              "payment_on = ?, source = ?, recorded_at = ? WHERE id = ?", statement + (statement_id,))
+            self.conn.execute("DELETE FROM card_summaries WHERE statement_id = ?", (statement_id,))
+        else:
+            statement_id = self.conn.execute(
+                "INSERT INTO statements (bank, statement_date, payment_date, statement_on, payment_on, source, recorded_at, pdf_sha256) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", statement + (pdf_sha256,)).lastrowid
+
+        for position, (card_no, values) in enumerate(results.items()):
+            if isinstance(values, StatementRecord):
+                cents = values.cents()
+            else:
+                cents = tuple(to_cents(values.get(field)) for field in AMOUNT_KEYS)
+            self.conn.execute("INSERT INTO cards (bank, card_no, card_name) VALUES (?, ?, ?) "
+                              "ON CONFLICT (bank, card_no) DO UPDATE SET card_name = excluded.card_name",
+                              (bank_name, card_no, values.get("card_name")))
+            card_id = self.conn.execute("SELECT id FROM cards WHERE bank = ? AND card_no = ?", (bank_name, card_no)).fetchone()[0]
+            self.conn.execute(
+                f"INSERT INTO card_summaries (statement_id, card_id, position, card_name, {', '.join(AMOUNT_KEYS)}) "
+                f"VALUES (?, ?, ?, ?, {', '.join('?' * len(AMOUNT_KEYS))})",
+                (statement_id, card_id, position, values.get("card_name")) + cents)
+        return statement_id
+
+    def record_statement(self, bank_name: str, dates: Dict[str, str], results: Dict[str, Dict[str, float]],
+                         pdf_sha256: Optional[str] = None, source: Optional[str] = None) -> int:
+        """Store one parsed statement, returns its statement id"""
+        return self.record_statements([(bank_name, dates, results, pdf_sha256, source)])[0]
+
+    def record_statements(self, statements: Iterable[Tuple]) -> List[int]:
+        """Store (bank_name, dates, results, pdf_sha256, source) statements in one transaction"""
+        try:
+            with self.conn:
+                ids = [self._insert(*statement) for statement in statements]
+        except sqlite3.Error as e:
+            logger.error("record_statements: Failed to write to ledger: %s", e)
+            raise RuntimeError(f"LEDGER ERROR: Failed to write to ledger: {str(e)}")
+        logger.info("record_statements: Recorded %s statements", len(ids))
+        return ids
+
+    def banks(self) -> List[str]:
+        """Banks in the order their first statement was recorded"""
+        rows = self.conn.execute("SELECT bank FROM statements GROUP BY bank ORDER BY MIN(id)").fetchall()
+        return [bank for bank, in rows]
+
+    def statements(self, bank_name: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, str], Dict[str, StatementRecord]]]:
+        """(bank_name, dates, results) of every statement in recording order, as the parser returned them"""
+        for _, _, bank, dates, results in self.archive(bank_name):
+            yield bank, dates, results
+
+    def archive(self, bank_name: Optional[str] = None) -> Iterator[Tuple[Optional[str], Optional[str], str, Dict[str, str], Dict[str, StatementRecord]]]:
+        """(pdf_sha256, source, bank_name, dates, results) of every statement in recording order"""
+        where, params = ("WHERE s.bank = ?", (bank_name,)) if bank_name else ("", ())
+        cursor = self.conn.execute(
+            f"SELECT s.id, s.pdf_sha256, s.source, s.bank, s.statement_date, s.payment_date, c.card_no, cs.card_name, "
+            f"{', '.join('cs.' + field for field in AMOUNT_KEYS)} "
+            f"FROM statements s LEFT JOIN card_summaries cs ON cs.statement_id = s.id "
+            f"LEFT JOIN cards c ON c.id = cs.card_id {where} ORDER BY s.id, cs.position", params)
+        current, statement = None, None
+        for row in cursor:
+            statement_id, pdf_sha256, source, bank, statement_date, payment_date, card_no, card_name = row[:8]
+            if statement_id != current:
+                if statement is not None:
+                    yield statement
+                current = statement_id
+                statement = (pdf_sha256, source, bank, {"statement_date": statement_date, "payment_date": payment_date}, {})
+            if card_no is not None:
+                statement[4][card_no] = StatementRecord.from_cents(card_name, row[8:])
+        if statement is not None:
+            yield statement
+
+    def max_cards(self) -> Dict[str, int]:
+        """Most cards on one statement, per bank"""
+        rows = self.conn.execute(
+            "SELECT bank, MAX(cards) FROM (SELECT s.bank, COUNT(cs.card_id) AS cards FROM statements s "
+            "LEFT JOIN card_summaries cs ON cs.statement_id = s.id GROUP BY s.id) GROUP BY bank").fetchall()
+        return dict(rows)
+
+    def latest_totals(self) -> Dict[str, Dict]:
+        """Balance due, minimum payment and payment due date of each bank's latest statement"""
+        rows = self.conn.execute(
+            "SELECT s.bank, SUM(cs.balance_due), SUM(cs.minimum_payment), s.payment_date "
+            "FROM (SELECT MIN(id) AS first_id, MAX(id) AS last_id FROM statements GROUP BY bank) b "
+            "JOIN statements s ON s.id = b.last_id "
+            "LEFT JOIN card_summaries cs ON cs.statement_id = s.id "
+            "GROUP BY s.id ORDER BY b.first_id").fetchall()
+        return {bank: {"Balance Due": from_cents(balance_due), "Minimum Payment": from_cents(minimum_payment),
+                       "Payment Due Date": payment_date}
+                for bank, balance_due, minimum_payment, payment_date in rows}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "Ledger":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
@@ -0,0 +1,168 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from credit_card_tracker.app.banks.statement_record import AMOUNT_KEYS
+from credit_card_tracker.app.processor_tools.ledger import Ledger
+from credit_card_tracker.app.processor_tools.statement_processor import CreditCardProcessor
+from credit_card_tracker.app.processor_tools.text_cache import TextCache
+from credit_card_tracker.app.processor_tools.text_extractor import TextExtractor
+from credit_card_tracker.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Outcome of one statement, see ReplayOutcome.status
+CHANGED, UNCHANGED, NEW, UNCACHED, FAILED = "changed", "unchanged", "new", "uncached", "failed"
+
+
+@dataclass
+class ReplayOutcome:
+    """One archived statement parsed again from its cached lines, or from its PDF when ``extracted``"""
+    pdf_sha256: Optional[str]
+    source: Optional[str]
+    status: str = UNCHANGED
+    bank_name: Optional[str] = None
+    previous_bank: Optional[str] = None
+    dates: Optional[Dict[str, str]] = None
+    results: Optional[Dict[str, Dict[str, float]]] = None
+    changes: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    extracted: bool = False
+
+
+def diff_statement(previous: Tuple[str, Dict[str, str], Dict[str, Dict[str, float]]],
+                   current: Tuple[str, Dict[str, str], Dict[str, Dict[str, float]]]) -> List[str]:
+    """What differs between two (bank_name, dates, results) parses of a statement, one line per field"""
+    (old_bank, old_dates, old_results), (bank, dates, results) = previous, current
+    changes = []
+    if old_bank != bank:
+        changes.append(f"bank: {old_bank} -> {bank}")
+    for key in ("statement_date", "payment_date"):
+        if old_dates.get(key) != dates.get(key):
+            changes.append(f"{key}: {old_dates.get(key)} -> {dates.get(key)}")
+    for card in old_results:
+        if card not in results:
+            changes.append(f"{card}: card no longer found")
+    for card, values in results.items():
+        old = old_results.get(card)
+        if old is None:
+            changes.append(f"{card}: new card")
+            continue
+        if old["card_name"] != values["card_name"]:
+            changes.append(f"{card} card_name: {old['card_name']} -> {values['card_name']}")
+        for key in AMOUNT_KEYS:
+            if old[key] != values[key]:
+                changes.append(f"{card} {key}: {old[key]:,.2f} -> {values[key]:,.2f}")
+    return changes
+
+
+class Replayer:
+    """Re-run the bank parsers over the TextCache lines of already processed statements.
+
+    For when a bank's keywords or block heuristics change: cached statements are
+    re-parsed at parse speed rather than decode speed. Each statement is compared with
+    what the ledger holds for the same PDF and comes back as a ReplayOutcome. Only
+    complete cache entries are used; a statement without one (encrypted, evicted, parsed
+    in streaming mode or decoded by another PyMuPDF version) is decoded again from its
+    PDF, which also caches it. If the PDF is gone, changed or cannot be opened with any
+    of the passwords, the statement comes back "uncached" with the reason in ``error``.
+
+        replayer = Replayer(ledger)
+        outcomes = list(replayer.replay_ledger())
+        replayer.record(outcomes)
+    """
+
+    def __init__(self, ledger: Ledger, cache: Optional[TextCache] = None, passwords: Optional[Dict[str, str]] = None,
+                 password: Optional[str] = None):
+        self.ledger = ledger
+        self.cache = cache or TextCache.default()
+        self.passwords = passwords or {}
+        self.password = password
+        self.processors: Dict[Optional[str], CreditCardProcessor] = {}
+        self.seconds = 0.0
+
+    def _passwords(self, bank_name: Optional[str]) -> List[Optional[str]]:
+        candidates = [self.passwords[bank_name]] if bank_name in self.passwords else []
+        candidates += [self.password] + list(self.passwords.values()) + [None]
+        return list(dict.fromkeys(candidates))
+
+    def extract_lines(self, pdf_sha256: Optional[str], source: Optional[str], bank_name: Optional[str] = None) -> List[str]:
+        """Decode a statement that is not cached from its PDF, raising with the reason when it cannot be"""
+        if not pdf_sha256:
+            raise RuntimeError("recorded without its PDF hash")
+        if not source or not os.path.exists(source):
+            raise RuntimeError("not in the text cache and the PDF is no longer at its recorded path")
+        if TextCache.file_sha256(source) != pdf_sha256:
+            raise RuntimeError("not in the text cache and the PDF at its recorded path has changed")
+        for password in self._passwords(bank_name):
+            try:
+                doc, encrypted = TextExtractor.open_document(source, password)
+            except RuntimeError as e:
+                if "Incorrect password" not in str(e):
+                    raise
+                continue
+            lines = list(TextExtractor.iter_lines(doc))
+            doc.close()
+            self.cache.put(pdf_sha256, lines, encrypted)
+            return lines
+        raise RuntimeError("not in the text cache and none of the passwords opens the PDF")
+
+    def replay_one(self, pdf_sha256: Optional[str], source: Optional[str], bank_name: Optional[str] = None,
+                   previous: Optional[Tuple] = None) -> ReplayOutcome:
+        """Parse one statement again and compare it with the previous (bank_name, dates, results)"""
+        outcome = ReplayOutcome(pdf_sha256, source, bank_name = bank_name)
+        lines = self.cache.get(pdf_sha256) if pdf_sha256 else None
+        if lines is None:
+            try:
+                lines = self.extract_lines(pdf_sha256, source, bank_name)
+            except Exception as e:
+                logger.warning("replay_one: Cannot replay %s: %s", source or pdf_sha256, e)
+                outcome.status, outcome.error = UNCACHED, str(e)
+                return outcome
+            outcome.extracted = True
+        start = time.perf_counter()
+        try:
+            processor = self.processors.get(bank_name)
+            if processor is None:
+                processor = self.processors[bank_name] = CreditCardProcessor(bank_name)
+            outcome.results, outcome.dates = processor.parse_lines(lines, bank_name)
+            outcome.bank_name = processor.bank_name
+        except Exception as e:
+            logger.warning("replay_one: Failed to parse %s: %s", source or pdf_sha256[:12], e)
+            outcome.status, outcome.error = FAILED, str(e)
+            return outcome
+        finally:
+            self.seconds += time.perf_counter() - start
+        if previous is None:
+            outcome.status = NEW
+        else:
+            outcome.previous_bank = previous[0]
+            outcome.changes = diff_statement(previous, (outcome.bank_name, outcome.dates, outcome.results))
+            outcome.status = CHANGED if outcome.changes else UNCHANGED
+        return outcome
+
+    def replay_ledger(self, bank_name: Optional[str] = None) -> Iterator[ReplayOutcome]:
+        """Replay every statement of the ledger, or of one bank, that was recorded with its PDF hash"""
+        for pdf_sha256, source, bank, dates, results in self.ledger.archive(bank_name):
+            yield self.replay_one(pdf_sha256, source, bank, (bank, dates, results))
+
+    def replay_files(self, pdf_paths: Iterable[str], bank_name: Optional[str] = None) -> Iterator[ReplayOutcome]:
+        """Replay PDFs by their hash, compared with the ledger's statement of the same PDF if it has one"""
+        recorded = {pdf_sha256: (bank, dates, results) for pdf_sha256, _, bank, dates, results in self.ledger.archive() if pdf_sha256}
+        for pdf_path in pdf_paths:
+            pdf_sha256 = TextCache.file_sha256(pdf_path)
+            previous = recorded.get(pdf_sha256)
+            yield self.replay_one(pdf_sha256, pdf_path, bank_name or (previous[0] if previous else None), previous)
+
+    def record(self, outcomes: Iterable[ReplayOutcome]) -> List[str]:
+        """Store changed and new statements in the ledger in place of their previous parse.
+
+        Returns the banks whose sheets are now out of date, including the old bank of a
+        statement that is now parsed as another bank's.
+        """
+        recorded = [o for o in outcomes if o.status in (CHANGED, NEW) and o.results]
+        if recorded:
+            self.ledger.record_statements([(o.bank_name, o.dates, o.results, o.pdf_sha256, o.source) for o in recorded])
+        logger.info("record: Recorded %s replayed statements", len(recorded))
+        banks = [bank_name for o in recorded for bank_name in (o.previous_bank, o.bank_name) if bank_name]
+        return list(dict.fromkeys(banks))
@@ -1,55 +1,102 @@
-from typing import Dict
-from credit_card_tracker.app.banks import UOB, HLB, MYB, RHB, PBB, CIMB
-from credit_card_tracker.app.processor_tools.text_extractor import TextExtractor
+from typing import Dict, List, Optional, Set
+from credit_card_tracker.app.banks import BANK_CLASSES
+from credit_card_tracker.app.banks.transactions import TransactionTable
+from credit_card_tracker.app.processor_tools.ledger import Ledger
+from credit_card_tracker.app.processor_tools.text_cache import TextCache
+from credit_card_tracker.app.processor_tools.text_extractor import TextExtractor, StreamedLines
 from credit_card_tracker.logger import get_logger
 
 logger = get_logger(__name__)
 
 
 class CreditCardProcessor:
-    BANK_CLASSES = {
-        "UOB": UOB,
-        "HLB": HLB,
-        "MYB": MYB,
-        "RHB": RHB,
-        "PBB": PBB,
-        "CIMB": CIMB,
-    }
+    BANK_CLASSES = BANK_CLASSES
     
-    def __init__(self, bank: str):
-        self.bank = self.BANK_CLASSES[bank]()
+    def __init__(self, bank: Optional[str] = None, ledger: Optional[Ledger] = None):
+        """Pass bank=None to detect the bank from the statement itself.
+
+        With a ``ledger`` every parsed statement is also recorded there.
+        """
+        self.bank = self.BANK_CLASSES[bank]() if bank else None
         self.bank_name = bank
+        self.ledger = ledger
+        self.pdf_sha256 = None
+
+    def parse_statement(self, pdf_path: str,bank_name:Optional[str] = None, password: str = None, stream: bool = False, use_cache: bool = True, workers: int = 1,
+                        transactions: Optional[TransactionTable] = None, ingested: Optional[Set[str]] = None) -> Dict[str, Dict[str, float]]:
+        """Always generates both raw text and blocks files.
+
+        ``stream=True`` lets the bank parser stop PDF decoding once its end keyword is seen.
+        ``use_cache=False`` forces a fresh decode instead of reusing cached lines.
+        ``workers`` spreads page decoding of large statements over a process pool.
+        Without a bank name the bank is detected from the extracted lines.
+        Every transaction row is also appended to ``transactions`` when one is given.
+        ``ingested`` holds the SHA-256 of PDFs already in the workbook, one of those raises
+        "DUPLICATE STATEMENT" before anything is decoded.
+        """
+        bank_name = bank_name or self.bank_name
+        self.pdf_sha256 = TextCache.file_sha256(pdf_path) if ingested is not None or self.ledger is not None else None
+        if ingested is not None and self.pdf_sha256 in ingested:
+            logger.warning("parse_statement: %s is already in the workbook, skipping", pdf_path)
+            raise RuntimeError("DUPLICATE STATEMENT: This statement is already in the Excel file")
+        lines = TextExtractor.extract_text(pdf_path, bank_name, password = password, stream = stream, use_cache = use_cache, workers = workers)  # extract_text now saves raw text
+        try:
+            results, dates = self.parse_lines(lines, bank_name, transactions)
+            if self.ledger is not None and results:
+                self.ledger.record_statement(self.bank_name, dates, results, pdf_sha256 = self.pdf_sha256, source = pdf_path)
+            return results, dates
+        finally:
+            if isinstance(lines, StreamedLines):
+                logger.info("parse_statement: Decoded %s pages in streaming mode", lines.pages_decoded)
+                lines.close()
+
+    def parse_lines(self, lines: List[str], bank_name: Optional[str] = None, transactions: Optional[TransactionTable] = None):
+        """Parse already extracted lines, e.g. from the TextCache, without opening the PDF.
+
+        Without a bank name the bank is detected from the lines.
+        """
+        if bank_name is None:
+            bank_class = TextExtractor.detect_bank(lines)
+            if bank_class is None:
+                raise RuntimeError("PDF MATCHING ERROR: could not detect the bank of this statement")
+            self.bank = bank_class()
+            self.bank_name = self.bank.config.name
+            logger.info("parse_lines: Detected bank %s", self.bank_name)
+        elif self.bank is None or self.bank_name != bank_name:
+            self.bank = self.BANK_CLASSES[bank_name]()
+            self.bank_name = bank_name
+        return self._parse_lines(lines, transactions)
 
-    def parse_statement(self, pdf_path: str,bank_name:str, password: str = None) -> Dict[str, Dict[str, float]]:
-        """Always generates both raw text and blocks files"""
-        lines = TextExtractor.extract_text(pdf_path, bank_name, password = password)  # extract_text now saves raw text
-        blocks = self.bank.create_blocks(lines)
+    def _parse_lines(self, lines: List[str], transactions: Optional[TransactionTable] = None):
+        # One pass builds the blocks and the anchors that extract and process_date jump to
+        scan = self.bank.scan(lines)
         
         if hasattr(self.bank, "extract"):
-            results = self.bank.extract(lines)
-            dates = self.bank.process_date(lines)
+            results = self.bank.extract(lines, scan)
+            dates = self.bank.process_date(lines, scan)
             logger.info("parse_statement: Starting to remove CR from card name")
             for card, result in results.items():
                 name = result["card_name"]
                 if "CR" in name:
                     new_name = name.replace("CR", "")
                     result["card_name"] = new_name
-                    logger.info(f"Removed CR from card name: {name}. Now is {new_name}")
+                    logger.info("Removed CR from card name: %s. Now is %s", name, new_name)
                 else:
-                    logger.info(f"No CR in card name: {name}")
-            return results,dates
+                    logger.info("No CR in card name: %s", name)
         else:
             results = {card: self.bank.process_block(block)
-                for card, block in blocks.items()}
-            dates = self.bank.process_date(lines)
+                for card, block in scan.blocks.items()}
+            dates = self.bank.process_date(lines, scan)
             logger.info("parse_statement: Starting to remove CR from card name")
             for card, result in results.items():
                 name = result["card_name"]
                 if "CR" in name:
                     new_name = name.replace("CR", "")
                     result["card_name"] = new_name
-                    logger.info(f"Removed CR from card name: {name}. Now is {new_name}")
-            return results,dates
+                    logger.info("Removed CR from card name: %s. Now is %s", name, new_name)
+        if transactions is not None:
+            self.bank.extract_transactions(scan, transactions, dates["statement_date"])
+        return results,dates
     
         
     
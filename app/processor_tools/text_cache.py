@@ -0,0 +1,141 @@
+import fitz
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from typing import List, Optional
+from credit_card_tracker.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TextCache:
+    """On-disk cache of extracted statement lines, keyed by PDF SHA-256 and PyMuPDF version.
+
+    Entries are zlib-compressed JSON. The directory is capped at ``max_bytes`` and the
+    least recently used entries (oldest mtime, bumped on every hit) are evicted first.
+    Lines of password-protected PDFs are never cached: the entries are readable by anyone
+    with access to the folder, which would undo the statement's password. Their text is
+    decoded again on every run. Only full documents are cached, a streamed parse that
+    stops at its end keyword leaves no entry. Entries of either kind left by older
+    versions are deleted on sight.
+    """
+
+    DEFAULT_DIR = os.path.join(os.path.expanduser("~"), "Documents", "Credit Card Tracker", "text_cache")
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    SUFFIX = ".lines.z"
+
+    _default = None
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True):
+        self.cache_dir = cache_dir or self.DEFAULT_DIR
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def default(cls) -> "TextCache":
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @staticmethod
+    def file_sha256(pdf_path: str) -> str:
+        sha = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def entry_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}-{fitz.VersionBind}{self.SUFFIX}")
+
+    def get(self, digest: str) -> Optional[List[str]]:
+        if not self.enabled:
+            return None
+        path = self.entry_path(digest)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except FileNotFoundError:
+            logger.info("get: Cache miss for %s", digest[:12])
+            return None
+        except Exception as e:
+            logger.warning("get: Discarding unreadable cache entry %s: %s", path, e)
+            self._remove(path)
+            return None
+
+        if "password_hash" in entry:
+            logger.warning("get: Deleting cached text of encrypted PDF %s left by an older version", digest[:12])
+            self._remove(path)
+            return None
+        if entry.get("partial"):
+            logger.info("get: Deleting partial cache entry for %s left by an older version", digest[:12])
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)  # bump for LRU
+        except OSError:
+            pass
+        logger.info("get: Cache hit for %s, %s lines", digest[:12], len(entry['lines']))
+        return entry["lines"]
+
+    def put(self, digest: str, lines: List[str], encrypted: bool = False) -> None:
+        if not self.enabled:
+            return
+        if encrypted:
+            logger.info("put: Not caching the text of encrypted PDF %s", digest[:12])
+            return
+        entry = {"lines": list(lines)}
+        data = zlib.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8"), 6)
+        path = self.entry_path(digest)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            logger.info("put: Cached %s lines for %s (%s bytes)", len(entry['lines']), digest[:12], len(data))
+        except OSError as e:
+            logger.warning("put: Failed to write cache entry %s: %s", path, e)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            logger.info("evict: Evicted %s", os.path.basename(path))
+
+    def clear(self) -> None:
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.SUFFIX):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,6 +1,12 @@
 import fitz
+import logging
+import os
 import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+from credit_card_tracker.app.banks import BANK_CLASSES
+from credit_card_tracker.app.banks.base_bank import BaseBank
+from credit_card_tracker.app.processor_tools.text_cache import TextCache
 from credit_card_tracker.logger import get_logger
 
 
@@ -27,42 +33,251 @@ bank_pdf_matching = {
              "keyword": ["hlb", "Hong Leong Bank Berhad"]},
 }
 
+
+class BankMatcher:
+    """Match statement lines against every bank's keywords in one pass.
+
+    All keywords of bank_pdf_matching are compiled into a single alternation (longest
+    first) and run once over the joined header lines. A hit also counts for any shorter
+    keyword it contains, e.g. "RHB Bank Berhad" covers "RHB Bank". A bank matches when
+    all its keywords are found inside its own line range.
+    """
+
+    def __init__(self, matching: Dict[str, Dict] = bank_pdf_matching):
+        self.matching = matching
+        keywords = sorted({kw for details in matching.values() for kw in details["keyword"]}, key = len, reverse = True)
+        self.pattern = re.compile("|".join(re.escape(kw) for kw in keywords))
+        self.implied = {kw: {other for other in keywords if other in kw} for kw in keywords}
+        self.scan_end = max(details["end"] for details in matching.values()) + 1
+
+    def scan(self, lines: List[str]) -> Dict[str, int]:
+        """Return matched bank names mapped to the offset of their first keyword hit"""
+        head = lines[0:self.scan_end]
+        offsets = []
+        position = 0
+        for line in head:
+            offsets.append(position)
+            position += len(line) + 1
+        offsets.append(position)
+        text = " ".join(head)
+
+        hits = [(m.start(), m.end(), self.implied[m.group(0)]) for m in self.pattern.finditer(text)]
+        matched = {}
+        for bank_name, details in self.matching.items():
+            start = offsets[min(details["start"], len(head))]
+            end = offsets[min(details["end"] + 1, len(head))] - 1
+            needed = set(details["keyword"])
+            first = None
+            for hit_start, hit_end, found in hits:
+                if hit_start >= start and hit_end <= end and found & needed:
+                    needed -= found
+                    first = hit_start if first is None else first
+                    if not needed:
+                        matched[bank_name] = first
+                        break
+        return matched
+
+
+def _decode_page_range(pdf_path: str, password: Optional[str], start: int, stop: int) -> List[str]:
+    """Process pool worker: open a private handle on the PDF and decode pages [start, stop)"""
+    doc, _ = TextExtractor.open_document(pdf_path, password)
+    try:
+        return [line for page_lines in TextExtractor.iter_page_lines(doc, start, stop) for line in page_lines]
+    finally:
+        doc.close()
+
+
+class StreamedLines:
+    """List-like view over a PDF that only decodes pages when their lines are needed.
+
+    Indexing, slicing and iteration pull pages in on demand, so a parser that stops
+    at its end keyword never pays for the marketing and T&C pages behind it.
+    ``len()`` has to decode everything and should be avoided on hot paths.
+    ``on_complete`` is called with the full line list if the document is read to the end.
+    """
+
+    def __init__(self, doc: fitz.Document, on_complete: Callable[[List[str]], None] = None):
+        self._doc = doc
+        self._on_complete = on_complete
+        self._pages = TextExtractor.iter_page_lines(doc)
+        self._lines: List[str] = []
+        self._exhausted = False
+        self.pages_decoded = 0
+
+    def _fill_to(self, count: Optional[int]) -> None:
+        while not self._exhausted and (count is None or len(self._lines) < count):
+            try:
+                self._lines.extend(next(self._pages))
+                self.pages_decoded += 1
+            except StopIteration:
+                self.close()
+                if self._on_complete:
+                    self._on_complete(self._lines)
+
+    def close(self) -> None:
+        if not self._exhausted:
+            self._exhausted = True
+            logger.debug("StreamedLines: Decoded %s lines, closing document", len(self._lines))
+            self._doc.close()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop = index.start, index.stop
+            if (start is not None and start < 0) or stop is None or stop < 0:
+                self._fill_to(None)
+            else:
+                self._fill_to(stop)
+            return self._lines[index]
+        self._fill_to(None if index < 0 else index + 1)
+        return self._lines[index]
+
+    def __iter__(self) -> Iterator[str]:
+        i = 0
+        while True:
+            self._fill_to(i + 1)
+            if i >= len(self._lines):
+                return
+            yield self._lines[i]
+            i += 1
+
+    def __len__(self) -> int:
+        self._fill_to(None)
+        return len(self._lines)
+
+    def index(self, value: str) -> int:
+        for i, line in enumerate(self):
+            if line == value:
+                return i
+        raise ValueError(f"{value!r} is not in lines")
+
+    def to_list(self) -> List[str]:
+        self._fill_to(None)
+        return list(self._lines)
+
+
 class TextExtractor:
+    # Below this many pages a process pool costs more to start than it saves
+    PARALLEL_MIN_PAGES = 8
+
+    bank_matcher = BankMatcher()
+
     @staticmethod
-    def extract_text(pdf_path: str,bank_name:str,  password: str = None) -> List[str]:
-        """Extract text from PDF and automatically save raw text file"""
+    def detect_bank(lines: List[str]) -> Optional[Type[BaseBank]]:
+        """Return the bank class whose keywords match the statement header, or None.
+
+        If several banks match (e.g. a CIMB payment listed on a Maybank statement) the
+        one whose keyword appears first wins.
+        """
+        matched = TextExtractor.bank_matcher.scan(lines)
+        if not matched:
+            logger.info("detect_bank: No bank matched the statement")
+            return None
+        bank_name = min(matched, key = matched.get)
+        if len(matched) > 1:
+            logger.info("detect_bank: Several banks matched %s, picking %s", matched, bank_name)
+        logger.info("detect_bank: Detected %s", bank_name)
+        return BANK_CLASSES[bank_name]
+
+    @staticmethod
+    def iter_page_lines(doc: fitz.Document, start: int = 0, stop: int = None) -> Iterator[List[str]]:
+        """Yield the stripped, non-empty lines of each page in order, decoding lazily"""
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for page_no in range(start, stop):
+            page = doc[page_no]
+            yield [line.strip() for line in page.get_text("text").split("\n") if line.strip()]
+
+    @staticmethod
+    def iter_lines(doc: fitz.Document) -> Iterator[str]:
+        """Yield statement lines one at a time, page by page"""
+        for page_lines in TextExtractor.iter_page_lines(doc):
+            yield from page_lines
+
+    @staticmethod
+    def open_document(pdf_path: str, password: str = None) -> Tuple[fitz.Document, bool]:
+        """Open and authenticate the PDF, returning the document and whether it needed a password"""
+        doc = fitz.open(pdf_path)
+        encrypted = doc.is_encrypted
+        if encrypted:
+            if not password or not doc.authenticate(password):
+                doc.close()
+                raise RuntimeError("Incorrect password. Please try again.")
+        logger.info("Received correct password. Proceeding with text extraction.")
+        return doc, encrypted
+
+    @staticmethod
+    def extract_lines_parallel(pdf_path: str, password: str, page_count: int, workers: int) -> List[str]:
+        """Decode the page range across a process pool, each worker opening its own document.
+
+        Slices are contiguous and results are stitched back in page order, so the output
+        is identical to the serial path.
+        """
+        workers = max(1, min(workers, page_count))
+        chunks = min(page_count, workers * 4)
+        bounds = [page_count * i // chunks for i in range(chunks + 1)]
+        starts, stops = bounds[:-1], bounds[1:]
+        logger.info("extract_lines_parallel: Decoding %s pages in %s slices on %s workers", page_count, chunks, workers)
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            parts = pool.map(_decode_page_range, [pdf_path] * chunks, [password] * chunks, starts, stops)
+            return [line for part in parts for line in part]
+
+    @staticmethod
+    def extract_text(pdf_path: str,bank_name:str,  password: str = None, stream: bool = False, use_cache: bool = True, workers: int = 1) -> List[str]:
+        """Extract text from PDF.
+
+        With ``stream=True`` a StreamedLines view is returned instead of a list and
+        pages are only decoded as the bank parser reaches them. Lines are looked up in
+        the TextCache before the document is opened; ``use_cache=False`` bypasses it.
+        ``workers > 1`` (or ``workers=0`` for one per CPU) decodes large documents on a
+        process pool; it is ignored in streaming mode. With ``bank_name=None`` the bank
+        check is skipped so the caller can run detect_bank on the lines instead.
+        """
         try:
-            
-            
-            doc = fitz.open(pdf_path)
-            if doc.is_encrypted:
-                if not password or not doc.authenticate(password):
-                    raise RuntimeError("Incorrect password. Please try again.")
-                        
-            logger.info("Received correct password. Proceeding with text extraction.")
-            
-            lines = [
-                line.strip() for page in doc
-                for line in page.get_text("text").split("\n")
-                if line.strip()
-            ]
-
-            details = bank_pdf_matching[bank_name]
-            logger.info(f"Loading details for {bank_name}:\n{details}")
-            subset_long_lines = " ".join(lines[details["start"]:details["end"]+1])
-            if not all (re.search(kw, subset_long_lines) for kw in details["keyword"]):
-                logger.info(f"Pdf not matched with bank.")
-                raise RuntimeError(f"PDF MATCHING ERROR")
-
-            
-                 
-            
-            logger_lines = "\n".join(lines)
-            logger.info(f"Extracted text for {bank_name}:\n {logger_lines}")
-            
+            cache = TextCache.default() if use_cache else None
+            digest = TextCache.file_sha256(pdf_path) if cache else None
+            lines = cache.get(digest) if cache else None
+
+            if lines is not None:
+                stream = False
+            else:
+                doc, encrypted = TextExtractor.open_document(pdf_path, password)
+
+                def store(all_lines: List[str]) -> None:
+                    cache.put(digest, all_lines, encrypted)
+
+                if workers == 0:
+                    workers = os.cpu_count() or 1
+                if stream:
+                    lines = StreamedLines(doc, on_complete = store if cache else None)
+                elif workers > 1 and doc.page_count >= TextExtractor.PARALLEL_MIN_PAGES:
+                    page_count = doc.page_count
+                    doc.close()
+                    lines = TextExtractor.extract_lines_parallel(pdf_path, password, page_count, workers)
+                    if cache:
+                        store(lines)
+                else:
+                    lines = list(TextExtractor.iter_lines(doc))
+                    doc.close()
+                    if cache:
+                        store(lines)
+
+            if bank_name is not None:
+                details = bank_pdf_matching[bank_name]
+                logger.info("Loading details for %s:\n%s", bank_name, details)
+                matched = TextExtractor.bank_matcher.scan(lines)
+                if bank_name not in matched:
+                    logger.info("Pdf not matched with bank. Banks matched instead: %s", list(matched))
+                    if stream:
+                        lines.close()
+                    detected = f" (statement looks like {min(matched, key = matched.get)})" if matched else ""
+                    raise RuntimeError(f"PDF MATCHING ERROR{detected}")
+
+            if stream:
+                logger.info("Streaming text for %s, pages are decoded on demand", bank_name or 'auto-detected bank')
+            elif logger.isEnabledFor(logging.DEBUG):
+                # Joining the whole statement is only worth it when someone reads it
+                logger.debug("Extracted text for %s:\n %s", bank_name, "\n".join(lines))
+
             return lines
-            
+
         except Exception as e:
             raise RuntimeError(f"PDF extraction failed: {str(e)}")
-
-    
\ No newline at end of file
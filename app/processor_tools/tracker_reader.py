@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+import os
+from typing import Dict, Iterator, List, Optional, Set
+from openpyxl import load_workbook
+from credit_card_tracker.app.banks.statement_record import AMOUNT_KEYS
+from credit_card_tracker.app.processor_tools.excel_operations import (HIDDEN_SHEETS, INDEX_HEADERS, INDEX_SHEET, INGESTED_HEADERS,
+                                                                      INGESTED_SHEET, ROW_LABELS, TOTAL_HEADERS, TOTAL_SHEET,
+                                                                      record_row)
+from credit_card_tracker.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class TrackerRecord:
+    """One statement as written on a bank sheet"""
+    bank: str
+    record_no: int
+    statement_date: Optional[str]
+    payment_date: Optional[str]
+    # card no -> card_name and amounts, the shape the bank parsers return
+    results: Dict[str, Dict] = field(default_factory=dict)
+    # Column D of the record
+    totals: Dict[str, float] = field(default_factory=dict)
+
+
+class TrackerReader:
+    """Read back tracker workbooks without building cell objects or styles.
+
+    The workbook is opened read-only with cached values instead of formulas, and bank sheets
+    are streamed row by row, so reporting over years of statements keeps memory flat.
+    A formula cell that Excel never calculated reads as None.
+
+        with TrackerReader(excel_path) as reader:
+            for record in reader.records("UOB"):
+                ...
+    """
+
+    def __init__(self, excel_path: str):
+        self.excel_path = excel_path
+        logger.info("TrackerReader: Opening %s read-only", excel_path)
+        try:
+            self.wb = load_workbook(excel_path, read_only=True, data_only=True)
+        except Exception as e:
+            logger.error("TrackerReader: Failed to open %s: %s", excel_path, e)
+            raise RuntimeError(f"TrackerReader: Failed to open {excel_path}: {str(e)}")
+
+    def banks(self) -> List[str]:
+        return [sheet for sheet in self.wb.sheetnames if sheet != TOTAL_SHEET and sheet not in HIDDEN_SHEETS]
+
+    def records(self, bank_name: Optional[str] = None) -> Iterator[TrackerRecord]:
+        """Records of one bank, or of every bank sheet in sheet order"""
+        for sheet in [bank_name] if bank_name else self.banks():
+            if sheet not in self.wb.sheetnames:
+                logger.warning("records: No sheet for %s in %s", sheet, self.excel_path)
+                continue
+            block = None
+            for values in self.wb[sheet].iter_rows(values_only=True):
+                # Every record starts with the "Record No." label in column A
+                if values and values[0] == "Record No.":
+                    if block is not None:
+                        logger.warning("records: Incomplete record in %s skipped", sheet)
+                    block = [values]
+                elif block is not None:
+                    block.append(values)
+                    if len(block) == len(ROW_LABELS):
+                        yield self._decode(sheet, block)
+                        block = None
+            if block is not None:
+                logger.warning("records: Incomplete last record in %s skipped", sheet)
+
+    @staticmethod
+    def _decode(bank_name: str, block: List[tuple]) -> TrackerRecord:
+        width = max(len(values) for values in block)
+        rows = [tuple(values) + (None,) * (width - len(values)) for values in block]
+        record = TrackerRecord(bank=bank_name, record_no=rows[1][0], statement_date=rows[1][1], payment_date=rows[7][1])
+        for col in range(4, width):
+            card = rows[1][col]
+            if card is None:
+                break
+            record.results[str(card)] = {"card_name": rows[0][col],
+                                         **{key: rows[offset][col] for offset, key in enumerate(AMOUNT_KEYS, start=2)}}
+        record.totals = {key: rows[offset][3] for offset, key in enumerate(AMOUNT_KEYS, start=2)}
+        return record
+
+    def latest(self) -> Dict[str, Dict]:
+        """Index entry (see RecordIndex) of every bank, from the hidden index sheet when there is one"""
+        if INDEX_SHEET in self.wb.sheetnames:
+            rows = self.wb[INDEX_SHEET].iter_rows(min_row=2, max_col=len(INDEX_HEADERS), values_only=True)
+            return {values[0]: dict(zip(INDEX_HEADERS, values)) for values in rows if values and values[0] is not None}
+        latest = {}
+        for record in self.records():
+            latest[record.bank] = dict(zip(INDEX_HEADERS, [record.bank, record.record_no, record_row(record.record_no), record.statement_date,
+                                                           record.totals["balance_due"], record.totals["minimum_payment"],
+                                                           record.payment_date]))
+        return latest
+
+    def totals(self) -> Dict[str, Dict]:
+        """Rows of the Total sheet by bank"""
+        if TOTAL_SHEET not in self.wb.sheetnames:
+            return {}
+        rows = self.wb[TOTAL_SHEET].iter_rows(min_row=2, max_col=len(TOTAL_HEADERS), values_only=True)
+        return {values[0]: dict(zip(TOTAL_HEADERS[1:], values[1:])) for values in rows if values and values[0] is not None}
+
+    def ingested(self) -> List[Dict]:
+        """Rows of the hidden ingested sheet (see IngestIndex), empty for workbooks that have none yet"""
+        if INGESTED_SHEET not in self.wb.sheetnames:
+            return []
+        rows = self.wb[INGESTED_SHEET].iter_rows(min_row=2, max_col=len(INGESTED_HEADERS), values_only=True)
+        return [dict(zip(INGESTED_HEADERS, values)) for values in rows if values and (values[0] or values[1])]
+
+    def close(self) -> None:
+        # Read-only workbooks keep the archive open until closed
+        self.wb.close()
+
+    def __enter__(self) -> "TrackerReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def ingested_hashes(excel_path: str) -> Set[str]:
+    """SHA-256 of every PDF already written to the workbook, empty if it does not exist yet"""
+    if not excel_path or not os.path.exists(excel_path):
+        return set()
+    with TrackerReader(excel_path) as reader:
+        return {row["PDF SHA-256"] for row in reader.ingested() if row["PDF SHA-256"]}
@@ -0,0 +1,204 @@
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+from openpyxl import Workbook, load_workbook
+from credit_card_tracker.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+
+def _lock_fd(fd: int) -> None:
+    """Non-blocking exclusive lock, raises OSError while another process holds it"""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+
+def _unlock_fd(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class WorkbookLock:
+    """Advisory lock on ``<workbook>.lock``, held from loading a workbook until it is saved.
+
+    Every writer in the tracker takes it, so processes updating the same workbook run one
+    after another instead of overwriting each other's records. Waits up to ``timeout``
+    seconds, then raises RuntimeError("WORKBOOK LOCKED: ...").
+
+    Re-entrant within a process: a lock taken while the same workbook is already locked
+    here (e.g. a session inside a held lock) just nests.
+    """
+
+    DEFAULT_TIMEOUT = 30.0
+    POLL_SECONDS = 0.05
+    # lock path -> [fd, depth] of the locks this process holds
+    _held: Dict[str, List[int]] = {}
+
+    def __init__(self, excel_path: str, timeout: float = DEFAULT_TIMEOUT):
+        self.lock_path = os.path.abspath(f"{excel_path}.lock")
+        self.timeout = timeout
+        self.locked = False
+
+    def acquire(self) -> None:
+        if self.locked:
+            return
+        held = self._held.get(self.lock_path)
+        if held is not None:
+            held[1] += 1
+            self.locked = True
+            return
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                _lock_fd(fd)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    logger.error("acquire: Timed out waiting for %s", self.lock_path)
+                    raise RuntimeError(f"WORKBOOK LOCKED: {self.lock_path} is held by another process")
+                time.sleep(self.POLL_SECONDS)
+        self._held[self.lock_path] = [fd, 1]
+        self.locked = True
+        logger.debug("acquire: Locked %s", self.lock_path)
+
+    def release(self) -> None:
+        if not self.locked:
+            return
+        self.locked = False
+        held = self._held[self.lock_path]
+        held[1] -= 1
+        if held[1]:
+            return
+        del self._held[self.lock_path]
+        try:
+            _unlock_fd(held[0])
+        finally:
+            os.close(held[0])
+        logger.debug("release: Unlocked %s", self.lock_path)
+
+    def __enter__(self) -> "WorkbookLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.release()
+        return False
+
+
+def save_atomic(wb: Workbook, excel_path: str) -> None:
+    """Save through a temp file in the same folder, fsync it and rename it over ``excel_path``.
+
+    A crash or a failed save leaves either the old workbook or the new one, never a
+    half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(excel_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".xlsx.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            wb.save(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600, keep the permissions the workbook had
+        if os.path.exists(excel_path):
+            os.chmod(tmp_path, os.stat(excel_path).st_mode & 0o777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        try:
+            os.replace(tmp_path, excel_path)
+        except PermissionError as e:
+            # Windows refuses to replace a workbook that is open in Excel
+            raise PermissionError(f"Permission denied: {excel_path} ({e})")
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fcntl is not None:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class WorkbookSession:
+    """Open a workbook once, apply every change in memory and write it back with one save.
+
+    Used as a context manager, the workbook is saved when the block exits cleanly and
+    left untouched on disk if it raises:
+
+        with WorkbookSession(excel_path) as wb:
+            manager.insert_record(wb)
+            manager.write_total_sheet(wb)
+
+    ``create=True`` starts from an empty workbook (no default sheet) instead of loading
+    ``excel_path``, overwriting any file already there on commit.
+
+    The session holds a WorkbookLock from open() to close(), and commit() saves with
+    save_atomic, so concurrent sessions on one workbook are serialised and a crash never
+    leaves a half-written file.
+    """
+
+    def __init__(self, excel_path: str, create: bool = False, lock_timeout: float = WorkbookLock.DEFAULT_TIMEOUT):
+        self.excel_path = excel_path
+        self.create = create
+        self.lock = WorkbookLock(excel_path, lock_timeout)
+        self.wb: Optional[Workbook] = None
+
+    def open(self) -> Workbook:
+        if self.wb is None:
+            self.lock.acquire()
+            try:
+                if self.create:
+                    logger.info("open: Starting new workbook for %s", self.excel_path)
+                    self.wb = Workbook()
+                    self.wb.remove(self.wb.active)
+                else:
+                    logger.info("open: Loading workbook %s", self.excel_path)
+                    self.wb = load_workbook(self.excel_path)
+            except BaseException:
+                self.lock.release()
+                raise
+        return self.wb
+
+    def commit(self) -> None:
+        if self.wb is None:
+            return
+        save_atomic(self.wb, self.excel_path)
+        logger.info("commit: Saved workbook %s", self.excel_path)
+
+    def close(self) -> None:
+        if self.wb is not None:
+            self.wb.close()
+            self.wb = None
+        self.lock.release()
+
+    def __enter__(self) -> Workbook:
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                logger.warning("WorkbookSession: Discarding changes to %s after error: %s", self.excel_path, exc)
+        finally:
+            self.close()
+        return False
@@ -0,0 +1,42 @@
+import argparse
+import logging
+from typing import List
+from credit_card_tracker.app.banks import BANK_CLASSES
+from credit_card_tracker.benchmarks.generators import synthetic_lines
+from credit_card_tracker.benchmarks.harness import parse, time_call
+
+# Roughly 200 lines per card block
+LINES_PER_CARD = 200
+TRANSACTIONS_PER_CARD = 60
+
+
+def run(sizes: List[int], banks: List[str], repeat: int) -> None:
+    print(f"{'bank':<6}{'lines':>8}{'scan ms':>10}{'parse ms':>10}{'us/line':>9}")
+    for bank_name in banks:
+        bank = BANK_CLASSES[bank_name]()
+        per_line = []
+        for size in sizes:
+            lines = synthetic_lines(bank_name, cards = max(1, size // LINES_PER_CARD), transactions_per_card = TRANSACTIONS_PER_CARD)
+            scan_seconds = time_call(lambda: bank.scan(lines), repeat)
+
+            parse_seconds = time_call(lambda: parse(bank, lines), repeat)
+            per_line.append(parse_seconds / len(lines))
+            print(f"{bank_name:<6}{len(lines):>8}{scan_seconds * 1000:>10.1f}{parse_seconds * 1000:>10.1f}{per_line[-1] * 1e6:>9.2f}")
+        # Linear scaling keeps the cost per line flat as the statement grows
+        print(f"{bank_name:<6}cost per line, largest vs smallest input: {per_line[-1] / per_line[0]:.2f}x\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = "Time BaseBank.scan and the parse pipeline on synthetic statements")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [1250, 2500, 5000, 10000])
+    parser.add_argument("--banks", nargs = "+", default = list(BANK_CLASSES.keys()), choices = list(BANK_CLASSES.keys()))
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    # Keep log I/O out of the measurement
+    logging.disable(logging.CRITICAL)
+    run(args.sizes, args.banks, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import random
+from typing import Callable, Dict, List, Optional
+import fitz
+from credit_card_tracker.app.banks import BANK_CLASSES
+from credit_card_tracker.app.banks.base_bank import BankConfig
+
+# Merchant names without "CR" or any bank keyword in them, so they never trip a classifier
+MERCHANTS = ["GRAB RIDE KUALA LUMPUR", "SHOPEE MALAYSIA", "TNG EWALLET RELOAD", "PETRONAS SS2",
+             "MCDONALDS BANGSAR", "NETFLIX.COM", "AEON BIG MID VALLEY", "SPOTIFY AB", "LAZADA MY",
+             "STARBUCKS KLCC", "WATSONS PAVILION", "AIRASIA BERHAD", "UNIQLO SUNWAY", "IKEA DAMANSARA"]
+PRODUCTS = ["VISA PLATINUM", "MASTERCARD WORLD", "VISA SIGNATURE", "AMEX GOLD", "VISA INFINITE"]
+HOLDERS = ["JOHN DOE", "TAN MEI LING", "AHMAD BIN ALI", "SITI NURHALIZA", "LIM WEI JIE"]
+STATEMENT_DATE = "12 MAR 2025"
+PAYMENT_DATE = "01 APR 2025"
+
+
+def money(rnd: random.Random, low: float = 1.0, high: float = 2500.0) -> str:
+    return f"{rnd.uniform(low, high):,.2f}"
+
+
+def card_number(config: BankConfig, rnd: random.Random) -> str:
+    """A card number line that matches the bank's card_pattern"""
+    digits = [f"{rnd.randint(1000, 9999)}" for _ in range(4)]
+    if r"\*\*" in config.card_pattern:
+        return f"**{'-'.join(digits)}**"
+    return ("-" if "-" in config.card_pattern else " ").join(digits)
+
+
+def transactions(config: BankConfig, rnd: random.Random, count: int, foreign_ratio: float, credit_ratio: float,
+                 credit_on_line: bool = True) -> List[str]:
+    """Transaction lines: date, merchant, optional foreign amount, local amount.
+
+    Credits are written as "<amount> CR" when the bank reads CR entries line by line.
+    """
+    lines = []
+    for _ in range(count):
+        day = f"{rnd.randint(1, 28):02d} FEB"
+        roll = rnd.random()
+        if roll < credit_ratio and credit_on_line:
+            lines += [day, "PAYMENT RECEIVED - THANK YOU", f"{money(rnd, 50, 3000)} CR"]
+        elif roll < credit_ratio + foreign_ratio and config.foreign_currencies:
+            currency = rnd.choice(config.foreign_currencies)
+            lines += [day, rnd.choice(MERCHANTS), f"{currency} {money(rnd)}", money(rnd)]
+        else:
+            lines += [day, rnd.choice(MERCHANTS), money(rnd)]
+    return lines
+
+
+def filler(count: int, label: str = "Customer service line") -> List[str]:
+    return [f"{label} {i + 1}" for i in range(count)]
+
+
+def uob_lines(config: BankConfig, rnd: random.Random, cards: int, count: int, foreign_ratio: float, credit_ratio: float) -> List[str]:
+    lines = ["Statement of Account", "UOB Card Centre", "United Overseas Bank (Malaysia) Bhd",
+             config.statement_date_keyword[0], STATEMENT_DATE, config.payment_date_keyword[0], PAYMENT_DATE]
+    lines.append(config.start_keywords[0])
+    for _ in range(cards):
+        # UOB prints the card name on the two lines above the card number
+        lines += [rnd.choice(PRODUCTS), rnd.choice(HOLDERS), card_number(config, rnd)]
+        lines += [config.previous_balance_keywords[0], money(rnd)]
+        lines += transactions(config, rnd, count, foreign_ratio, credit_ratio)
+        lines += [config.debit_fees_keywords[0], money(rnd, 0, 50)]
+        lines += [config.balance_due_keywords[0], money(rnd)]
+        lines += [config.minimum_payment_keywords[0], money(rnd, 50, 500)]
+    lines.append(config.end_keywords[0])
+    return lines
+
+
+def hlb_lines(config: BankConfig, rnd: random.Random, cards: int, count: int, foreign_ratio: float, credit_ratio: float) -> List[str]:
+    lines = ["Statement of Account", config.statement_date_keyword[0], STATEMENT_DATE,
+             config.payment_date_keyword[0], "Tarikh Akhir Pembayaran", PAYMENT_DATE]
+    # Bank detection looks for HLB between lines 50 and 80
+    lines += filler(50 - len(lines))
+    lines += ["Hong Leong Bank Berhad", "hlb.com.my", config.start_keywords[0]]
+    for _ in range(cards):
+        # Card name sits on the card number line, minimum payment five lines below it
+        lines += [f"{rnd.choice(PRODUCTS)} {card_number(config, rnd)}", rnd.choice(HOLDERS), "Card Limit 20,000.00",
+                  "Available Limit 15,000.00", "Payment Status Normal", f"Minimum Payment {money(rnd, 50, 500)}"]
+        lines += [config.previous_balance_keywords[0], money(rnd)]
+        lines += transactions(config, rnd, count, foreign_ratio, credit_ratio)
+        lines += [config.debit_fees_keywords[0], money(rnd, 0, 50)]
+        lines += [config.balance_due_keywords[0], money(rnd)]
+    lines.append(config.end_keywords[0])
+    return lines
+
+
+def myb_lines(config: BankConfig, rnd: random.Random, cards: int, count: int, foreign_ratio: float, credit_ratio: float) -> List[str]:
+    lines = ["Statement of Account", "Maybank Card Centre", "MAYBANK", config.statement_date_keyword[0], STATEMENT_DATE, PAYMENT_DATE]
+    lines.append(config.start_keywords[0])
+    for _ in range(cards):
+        # Minimum payment two lines below the card number, totals follow the transactions
+        lines += [f"{rnd.choice(PRODUCTS)} {card_number(config, rnd)}", rnd.choice(HOLDERS), money(rnd, 50, 500)]
+        lines += [config.previous_balance_keywords[0], money(rnd)]
+        lines += transactions(config, rnd, count, foreign_ratio, credit_ratio, credit_on_line = False)
+        lines += [config.credit_payment_keywords[0], money(rnd, 50, 3000)]
+        lines += [config.retail_purchase_keywords[0], money(rnd)]
+        lines += [config.balance_due_keywords[0], money(rnd)]
+    lines.append(config.end_keywords[1])
+    return lines
+
+
+def pbb_lines(config: BankConfig, rnd: random.Random, cards: int, count: int, foreign_ratio: float, credit_ratio: float) -> List[str]:
+    lines = ["Statement of Account", config.statement_date_keyword[0], STATEMENT_DATE, "Tarikh Akhir Pembayaran", PAYMENT_DATE]
+    # Bank detection looks for PBB between lines 50 and 80
+    lines += filler(50 - len(lines))
+    lines += ["PUBLIC BANK BERHAD", config.start_keywords[0]]
+    for _ in range(cards):
+        # Card name on the next line, minimum payment three lines below the card number
+        lines += [card_number(config, rnd), rnd.choice(PRODUCTS), rnd.choice(HOLDERS), money(rnd, 50, 500)]
+        lines += [config.previous_balance_keywords[0], money(rnd)]
+        lines += transactions(config, rnd, count, foreign_ratio, credit_ratio, credit_on_line = False)
+        lines += [config.credit_payment_keywords[0], money(rnd, 50, 3000)]
+        lines += [config.retail_purchase_keywords[0], money(rnd)]
+        lines += [config.debit_fees_keywords[0], money(rnd, 0, 50)]
+        lines += [config.balance_due_keywords[0], money(rnd)]
+    lines.append(config.end_keywords[0])
+    return lines
+
+
+def rhb_lines(config: BankConfig, rnd: random.Random, cards: int, count: int, foreign_ratio: float, credit_ratio: float) -> List[str]:
+    lines = ["Statement of Account", "RHB Bank Berhad", f"{config.statement_date_keyword[0]} {STATEMENT_DATE}",
+             config.payment_date_keyword[0], PAYMENT_DATE, config.start_keywords[0]]
+    for _ in range(cards):
+        # Card name on the next line, minimum payment four lines below the card number
+        lines += [card_number(config, rnd), rnd.choice(PRODUCTS), rnd.choice(HOLDERS),
+                  "Card Limit 20,000.00", f"Minimum Payment {money(rnd, 50, 500)}"]
+        lines += [config.previous_balance_keywords[0], money(rnd)]
+        lines += transactions(config, rnd, count, foreign_ratio, credit_ratio)
+        lines += [config.debit_fees_keywords[0], money(rnd, 0, 50)]
+        lines += [config.balance_due_keywords[0], money(rnd)]
+    lines.append(config.end_keywords[0])
+    return lines
+
+
+def cimb_lines(config: BankConfig, rnd: random.Random, cards: int, count: int, foreign_ratio: float, credit_ratio: float) -> List[str]:
+    lines = ["Statement of Account", "CIMB Bank Berhad", "cimb.com.my", config.statement_date_keyword[0], STATEMENT_DATE, PAYMENT_DATE,
+             config.start_keywords[0]]
+    for _ in range(cards):
+        # Card name on the next line, minimum payment four lines below the card number
+        lines += [card_number(config, rnd), rnd.choice(PRODUCTS), rnd.choice(HOLDERS),
+                  "Card Limit 20,000.00", f"Minimum Payment {money(rnd, 50, 500)}"]
+        lines += [config.previous_balance_keywords[0], money(rnd)]
+        lines += transactions(config, rnd, count, foreign_ratio, credit_ratio)
+        lines += [config.debit_fees_keywords[0], money(rnd, 0, 50)]
+        lines += [config.balance_due_keywords[0], money(rnd)]
+    lines.append(config.end_keywords[0])
+    return lines
+
+
+LAYOUTS: Dict[str, Callable[..., List[str]]] = {
+    "UOB": uob_lines,
+    "HLB": hlb_lines,
+    "MYB": myb_lines,
+    "PBB": pbb_lines,
+    "RHB": rhb_lines,
+    "CIMB": cimb_lines,
+}
+
+
+def synthetic_lines(bank_name: str, cards: int = 2, transactions_per_card: int = 20, foreign_ratio: float = 0.15,
+                    credit_ratio: float = 0.05, trailer_lines: int = 0, seed: int = 0) -> List[str]:
+    """Statement lines in the bank's layout, built from the keywords of its get_config.
+
+    ``trailer_lines`` appends marketing/T&C text after the end keyword, which a streaming
+    parse never needs to decode.
+    """
+    config = BANK_CLASSES[bank_name].get_config()
+    rnd = random.Random(seed)
+    lines = LAYOUTS[bank_name](config, rnd, cards, transactions_per_card, foreign_ratio, credit_ratio)
+    return lines + filler(trailer_lines, "Terms and conditions apply, clause")
+
+
+def write_pdf(path: str, lines: List[str], lines_per_page: int = 60, password: Optional[str] = None) -> str:
+    """Write one line of text per row, so PyMuPDF extracts exactly ``lines`` back"""
+    doc = fitz.open()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        y = 30
+        for line in lines[start:start + lines_per_page]:
+            page.insert_text((30, y), line, fontsize = 8)
+            y += 12
+    if password:
+        doc.save(path, encryption = fitz.PDF_ENCRYPT_AES_256, user_pw = password, owner_pw = password)
+    else:
+        doc.save(path)
+    doc.close()
+    return path
+
+
+def synthetic_pdf(path: str, bank_name: str, password: Optional[str] = None, lines_per_page: int = 60, **kwargs) -> str:
+    """Write a synthetic statement PDF, keyword arguments as for synthetic_lines"""
+    return write_pdf(path, synthetic_lines(bank_name, **kwargs), lines_per_page, password)
@@ -0,0 +1,170 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import fitz
+from credit_card_tracker.app.banks import BANK_CLASSES
+from credit_card_tracker.app.processor_tools import ExcelManager, TextExtractor
+from credit_card_tracker.app.processor_tools.ledger import iso_date
+from credit_card_tracker.benchmarks.generators import synthetic_lines, write_pdf
+
+STAGES = ("extract_text", "create_blocks", "extract", "excel_create", "excel_update")
+DEFAULT_SIZES = ["1x20", "2x100", "4x500"]
+# Records already in the workbook when excel_update is timed, about a year of statements
+HISTORY = 12
+
+
+def time_call(func: Callable[[], object], repeat: int, setup: Callable[[], None] = None) -> float:
+    """Best wall time of ``repeat`` runs, ``setup`` runs untimed before each one"""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    """"2x100" -> 2 cards with 100 transactions each"""
+    cards, transactions = size.lower().split("x")
+    return int(cards), int(transactions)
+
+
+def parse(bank, lines: List[str]):
+    scan = bank.scan(lines)
+    if hasattr(bank, "extract"):
+        results = bank.extract(lines, scan)
+    else:
+        results = {card: bank.process_block(block) for card, block in scan.blocks.items()}
+    return results, bank.process_date(lines, scan)
+
+
+def history_dates(dates: Dict[str, str], months_back: int) -> Dict[str, str]:
+    """Statement and payment dates ``months_back`` months before ``dates``.
+
+    Each history record needs its own statement date, the workbook refuses a second
+    copy of the same statement.
+    """
+    statement_on = datetime.date.fromisoformat(iso_date(dates.get("statement_date")) or "2025-03-12")
+    month = statement_on.year * 12 + statement_on.month - 1 - months_back
+    year, month = divmod(month, 12)
+    statement_on = statement_on.replace(year = year, month = month + 1, day = min(statement_on.day, 28))
+    payment_on = statement_on + datetime.timedelta(days = 20)
+    return {"statement_date": statement_on.strftime("%d %b %Y").upper(), "payment_date": payment_on.strftime("%d %b %Y").upper()}
+
+
+def bench_bank(bank_name: str, size: str, workdir: str, repeat: int) -> List[Dict]:
+    cards, transactions = parse_size(size)
+    lines = synthetic_lines(bank_name, cards = cards, transactions_per_card = transactions, trailer_lines = 120)
+    pdf_path = write_pdf(os.path.join(workdir, f"{bank_name}_{size}.pdf"), lines)
+    with fitz.open(pdf_path) as doc:
+        pages = doc.page_count
+    bank = BANK_CLASSES[bank_name]()
+    results, dates = parse(bank, lines)
+    manager = ExcelManager(bank_name, dates, results)
+
+    excel_path = os.path.join(workdir, f"{bank_name}_{size}.xlsx")
+    history_path = os.path.join(workdir, f"{bank_name}_{size}_history.xlsx")
+    # A year of earlier statements, so excel_update times a genuine append of the latest one
+    ExcelManager(bank_name, history_dates(dates, HISTORY), results).create_excel_file(history_path)
+    for months_back in range(HISTORY - 1, 0, -1):
+        ExcelManager(bank_name, history_dates(dates, months_back), results).update_excel(history_path)
+
+    def fresh_workbook() -> None:
+        if os.path.exists(excel_path):
+            os.remove(excel_path)
+
+    def history_copy() -> None:
+        shutil.copyfile(history_path, excel_path)
+
+    timings = {
+        "extract_text": time_call(lambda: TextExtractor.extract_text(pdf_path, bank_name, use_cache = False), repeat),
+        "create_blocks": time_call(lambda: bank.create_blocks(lines), repeat),
+        "extract": time_call(lambda: parse(bank, lines), repeat),
+        "excel_create": time_call(lambda: manager.create_excel_file(excel_path), repeat, setup = fresh_workbook),
+        "excel_update": time_call(lambda: manager.update_excel(excel_path), repeat, setup = history_copy),
+    }
+    return [{"bank": bank_name, "size": size, "lines": len(lines), "pages": pages, "stage": stage, "seconds": timings[stage]}
+            for stage in STAGES]
+
+
+def run(banks: List[str], sizes: List[str], repeat: int) -> Dict:
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec = "seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pymupdf": fitz.VersionBind,
+            "repeat": repeat,
+        },
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for bank_name in banks:
+            for size in sizes:
+                rows = bench_bank(bank_name, size, workdir, repeat)
+                report["results"] += rows
+                for row in rows:
+                    print(f"{bank_name:<6}{size:>8}{row['lines']:>8}{row['stage']:>15}{row['seconds'] * 1000:>11.1f} ms")
+    return report
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> int:
+    """Print current vs baseline per bank/size/stage, return the number of regressions"""
+    previous = {(r["bank"], r["size"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    regressions = 0
+    print(f"\n{'bank':<6}{'size':>8}{'stage':>15}{'base ms':>11}{'now ms':>11}{'ratio':>8}")
+    for row in report["results"]:
+        base = previous.get((row["bank"], row["size"], row["stage"]))
+        if base is None:
+            continue
+        ratio = row["seconds"] / base if base else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{row['bank']:<6}{row['size']:>8}{row['stage']:>15}{base * 1000:>11.1f}{row['seconds'] * 1000:>11.1f}{ratio:>7.2f}x{flag}")
+    print(f"\n{regressions} regression(s) above {threshold:.2f}x")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description = "Time each parsing and Excel stage on synthetic statements")
+    parser.add_argument("--banks", nargs = "+", default = list(BANK_CLASSES.keys()), choices = list(BANK_CLASSES.keys()))
+    parser.add_argument("--sizes", nargs = "+", default = DEFAULT_SIZES, help = "CARDSxTRANSACTIONS per card, e.g. 2x100")
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("-o", "--output", help = "Write the results as JSON")
+    parser.add_argument("--compare", help = "Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type = float, default = 1.25, help = "Slowdown ratio reported as a regression")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # Keep log I/O out of the measurement
+    logging.disable(logging.CRITICAL)
+    report = run(args.banks, args.sizes, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent = 2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        return 1 if compare(report, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,5 @@
-DEBUG = True
\ No newline at end of file
+DEBUG = False
+
+# Per-subsystem log levels applied on top of DEBUG, e.g. trace only the bank parsers with
+# {"credit_card_tracker.app.banks": "DEBUG"} or silence one module with "ERROR"
+LOG_LEVELS = {}
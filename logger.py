@@ -1,30 +1,85 @@
+import atexit
 import logging
-from .config import DEBUG
+import logging.handlers
 import os
+import queue
+from .config import DEBUG, LOG_LEVELS
 
-# Create a logger
-def get_logger(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG if DEBUG else logging.WARNING)
+# Every module logger (credit_card_tracker.app...) is a child of this one
+PACKAGE_LOGGER = "credit_card_tracker"
+
+_listener = None
+
+
+def setup_logging() -> logging.Logger:
+    """Install the file and console handlers once, on the package logger.
+
+    Records are put on a queue and written by a QueueListener thread, so a log call
+    never waits on disk or console I/O. Levels from config.LOG_LEVELS are applied per
+    subsystem on top of the DEBUG switch.
+    """
+    global _listener
+    package_logger = logging.getLogger(PACKAGE_LOGGER)
+    if _listener is not None:
+        return package_logger
+
+    level = logging.DEBUG if DEBUG else logging.WARNING
 
     # Create a file handler
     log_dir = os.path.join(os.path.expanduser("~"), "Documents", "Credit Card Tracker")
     os.makedirs(log_dir, exist_ok=True)
     log_path = os.path.join(log_dir, "app.log")
-    file_handler = logging.FileHandler(log_path, mode="a")
-    file_handler.setLevel(logging.DEBUG if DEBUG else logging.WARNING)
+    file_handler = logging.FileHandler(log_path, mode="a", delay=True)
     file_formatter = logging.Formatter(
         "[%(levelname)s] %(asctime)s - %(name)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
 
     # Create a console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG if DEBUG else logging.WARNING)
     console_formatter = logging.Formatter("[%(levelname)s] %(message)s")
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
 
-    return logger
\ No newline at end of file
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    package_logger.setLevel(level)
+    package_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    package_logger.propagate = False
+    for name, subsystem_level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(subsystem_level)
+    return package_logger
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _reset_after_fork() -> None:
+    """The writer thread does not survive fork(), give the child process its own"""
+    global _listener
+    _listener = None
+    package_logger = logging.getLogger(PACKAGE_LOGGER)
+    for handler in list(package_logger.handlers):
+        package_logger.removeHandler(handler)
+    setup_logging()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# Create a logger
+def get_logger(name):
+    setup_logging()
+    if name != PACKAGE_LOGGER and not name.startswith(PACKAGE_LOGGER + "."):
+        # Scripts run as __main__ still log through the package handlers
+        name = f"{PACKAGE_LOGGER}.{name}"
+    return logging.getLogger(name)
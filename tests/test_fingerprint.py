@@ -0,0 +1,55 @@
+import pytest
+
+from credit_card_tracker.app.processor_tools import ExcelManager, WorkbookSession
+from credit_card_tracker.app.processor_tools.excel_operations import IngestIndex, statement_fingerprint
+from credit_card_tracker.app.processor_tools.tracker_reader import TrackerReader
+
+
+def results(card: str, balance_due: float):
+    return {card: {"card_name": "VISA", "previous_balance": 0.0, "credit_payment": 0.0, "debit_fees": 0.0,
+                   "retail_purchase": balance_due, "balance_due": balance_due, "minimum_payment": 50.0}}
+
+
+UNDATED = {"statement_date": "", "payment_date": ""}
+DATED = {"statement_date": "12 MAR 2025", "payment_date": "01 APR 2025"}
+
+
+@pytest.mark.parametrize("statement_date", [None, "", "  ", "not a date"])
+def test_no_fingerprint_without_a_date(statement_date):
+    assert statement_fingerprint("UOB", statement_date, ["4111111111111234"]) is None
+
+
+def test_fingerprint_of_dated_statement():
+    assert statement_fingerprint("UOB", "12 MAR 2025", ["5678", "4111111111111234"]) == "UOB|2025-03-12|1234,5678"
+
+
+def test_undated_statements_are_not_duplicates(tmp_path):
+    path = str(tmp_path / "tracker.xlsx")
+    with WorkbookSession(path, create = True) as wb:
+        assert ExcelManager("UOB", UNDATED, results("4111111111111234", 100.0), "a" * 64).insert_record(wb) == "inserted"
+        assert ExcelManager("UOB", UNDATED, results("4111111111115678", 200.0), "b" * 64).insert_record(wb) == "updated"
+        assert ExcelManager("UOB", UNDATED, results("4111111111111234", 300.0)).insert_record(wb) == "updated"
+
+        # The same PDF is still caught by its hash
+        with pytest.raises(RuntimeError, match = "DUPLICATE STATEMENT"):
+            ExcelManager("UOB", UNDATED, results("4111111111111234", 100.0), "a" * 64).insert_record(wb)
+
+    with WorkbookSession(path) as wb:
+        ingested = IngestIndex(wb)
+        assert ingested.duplicate_of("UOB", "", ["4111111111111234"], "a" * 64) == ("UOB", 1)
+        assert ingested.duplicate_of("UOB", "", ["4111111111111234"]) is None
+    with TrackerReader(path) as reader:
+        assert [row["PDF SHA-256"] for row in reader.ingested()] == ["a" * 64, "b" * 64]
+
+
+def test_batch_keeps_undated_statements(tmp_path):
+    path = str(tmp_path / "tracker.xlsx")
+    statements = [("UOB", UNDATED, results("4111111111111234", 100.0), "a" * 64),
+                  ("UOB", UNDATED, results("4111111111111234", 200.0), "b" * 64),
+                  ("UOB", UNDATED, results("4111111111111234", 100.0), "a" * 64),
+                  ("UOB", DATED, results("4111111111111234", 400.0)),
+                  ("UOB", DATED, results("4111111111111234", 400.0))]
+    with WorkbookSession(path, create = True) as wb:
+        ExcelManager.insert_records(wb, statements)
+    with TrackerReader(path) as reader:
+        assert [row["Record No."] for row in reader.ingested()] == [1, 2, 3]
@@ -0,0 +1,66 @@
+import json
+import os
+import zlib
+
+import pytest
+
+from credit_card_tracker.app.processor_tools import CreditCardProcessor, Ledger
+from credit_card_tracker.app.processor_tools.replay import UNCACHED, UNCHANGED, Replayer
+from credit_card_tracker.app.processor_tools.text_cache import TextCache
+from credit_card_tracker.benchmarks.generators import synthetic_lines, write_pdf
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TextCache(str(tmp_path / "text_cache"))
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    with Ledger(str(tmp_path / "ledger.sqlite3")) as ledger:
+        yield ledger
+
+
+def record(ledger, pdf_path, bank_name = "UOB", password = None):
+    lines = synthetic_lines(bank_name, cards = 2, transactions_per_card = 5)
+    write_pdf(pdf_path, lines, password = password)
+    results, dates = CreditCardProcessor(bank_name).parse_lines(lines, bank_name)
+    sha = TextCache.file_sha256(pdf_path)
+    ledger.record_statement(bank_name, dates, results, sha, pdf_path)
+    return sha, lines
+
+
+def test_uncached_statement_is_decoded_from_its_pdf(ledger, cache, tmp_path):
+    sha, lines = record(ledger, str(tmp_path / "a.pdf"))
+    [outcome] = Replayer(ledger, cache).replay_ledger()
+    assert (outcome.status, outcome.extracted) == (UNCHANGED, True)
+    assert cache.get(sha) == lines
+
+    [outcome] = Replayer(ledger, cache).replay_ledger()
+    assert (outcome.status, outcome.extracted) == (UNCHANGED, False)
+
+
+def test_partial_entry_of_older_version_is_not_replayed(ledger, cache, tmp_path):
+    sha, lines = record(ledger, str(tmp_path / "a.pdf"))
+    with open(cache.entry_path(sha), "wb") as f:
+        f.write(zlib.compress(json.dumps({"lines": lines[:5], "partial": True}).encode("utf-8")))
+    [outcome] = Replayer(ledger, cache).replay_ledger()
+    assert (outcome.status, outcome.extracted) == (UNCHANGED, True)
+
+
+def test_encrypted_statement_needs_its_password(ledger, cache, tmp_path):
+    sha, _ = record(ledger, str(tmp_path / "locked.pdf"), password = "right")
+    [outcome] = Replayer(ledger, cache, password = "wrong").replay_ledger()
+    assert outcome.status == UNCACHED and "passwords" in outcome.error
+
+    [outcome] = Replayer(ledger, cache, {"UOB": "right"}).replay_ledger()
+    assert (outcome.status, outcome.extracted) == (UNCHANGED, True)
+    assert cache.get(sha) is None
+
+
+def test_missing_pdf_is_reported(ledger, cache, tmp_path):
+    pdf_path = str(tmp_path / "a.pdf")
+    record(ledger, pdf_path)
+    os.remove(pdf_path)
+    [outcome] = Replayer(ledger, cache).replay_ledger()
+    assert outcome.status == UNCACHED and "recorded path" in outcome.error
@@ -0,0 +1,49 @@
+import json
+import os
+import zlib
+
+import pytest
+
+from credit_card_tracker.app.processor_tools.text_cache import TextCache
+from credit_card_tracker.app.processor_tools.text_extractor import TextExtractor
+from credit_card_tracker.benchmarks.generators import synthetic_lines, write_pdf
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TextCache(str(tmp_path / "text_cache"))
+    monkeypatch.setattr(TextCache, "_default", cache)
+    return cache
+
+
+def test_encrypted_lines_are_not_cached(cache):
+    cache.put("a" * 64, ["secret line"], encrypted = True)
+    assert os.listdir(cache.cache_dir) == []
+    assert cache.get("a" * 64) is None
+
+
+def test_legacy_password_entry_is_deleted(cache):
+    path = cache.entry_path("b" * 64)
+    entry = {"lines": ["secret line"], "password_salt": "00", "password_hash": "ff"}
+    with open(path, "wb") as f:
+        f.write(zlib.compress(json.dumps(entry).encode("utf-8")))
+    assert cache.get("b" * 64) is None
+    assert not os.path.exists(path)
+
+
+def test_wrong_password_cannot_read_lines(cache, tmp_path):
+    lines = synthetic_lines("UOB", cards = 1, transactions_per_card = 5)
+    pdf_path = write_pdf(str(tmp_path / "locked.pdf"), lines, password = "right")
+
+    assert TextExtractor.extract_text(pdf_path, "UOB", "right") == lines
+    assert os.listdir(cache.cache_dir) == []
+    with pytest.raises(RuntimeError, match = "Incorrect password"):
+        TextExtractor.extract_text(pdf_path, "UOB", "wrong")
+
+
+def test_plain_lines_are_cached(cache, tmp_path):
+    lines = synthetic_lines("UOB", cards = 1, transactions_per_card = 5)
+    pdf_path = write_pdf(str(tmp_path / "plain.pdf"), lines)
+
+    assert TextExtractor.extract_text(pdf_path, "UOB") == lines
+    assert cache.get(TextCache.file_sha256(pdf_path)) == lines